@@ -1,6 +1,6 @@
 {
     "name": "Building & Monitoring Integration System",
-    "version": "17.0.1.0.0",
+    "version": "17.0.1.8.0",
     "summary": "Building & Monitoring Integration System",
     'sequence': -100,
     'category': 'EGP',
@@ -11,10 +11,32 @@
         # 'data/egp_bmis_default_data.xml',
         'security/ir.model.access.csv',
         'data/egp_bmis_default_data.xml',
+        'data/ir_cron_data.xml',
+        'data/mail_activity_data.xml',
         'views/menu.xml',
+        'views/construction_control_templates.xml',
+        'wizard/construction_control_remeasure_views.xml',
+        'wizard/construction_control_boq_import_views.xml',
         'views/construction_control_views.xml',
         'report/construction_control_report.xml',
+        'views/construction_control_ledger_views.xml',
+        'views/construction_control_print_batch_views.xml',
+        'views/construction_control_snapshot_views.xml',
+        'views/bmis_perf_log_views.xml',
+        'views/construction_control_dispatch_job_views.xml',
+        'views/hr_employee_views.xml',
+        'views/res_users_views.xml',
+        'views/construction_control_value_report_views.xml',
+        'views/construction_control_line_revision_views.xml',
+        'wizard/construction_control_revision_report_views.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'egp_bmis/static/src/js/contract_summary.js',
+            'egp_bmis/static/src/xml/contract_summary.xml',
+        ],
+    },
+    'post_init_hook': 'post_init_hook',
     "author": "Nasratullah Shafiq",
     "website": "https://mcit.gov.af/",
     "installable": True,
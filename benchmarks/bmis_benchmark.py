@@ -0,0 +1,182 @@
+"""
+Benchmark of the egp_bmis hot paths on synthetic data.
+
+Generates N construction contracts × M lines × K QC/PC rounds × P partial
+deliveries, then times the hot paths and counts their SQL queries. Results
+are written as JSON so that runs of different versions can be compared.
+Everything is rolled back at the end unless ``keep_data`` is set.
+
+Usage, from an Odoo shell on a database where egp_bmis is installed::
+
+    odoo-bin shell -d <database> <<'EOF'
+    from odoo.addons.egp_bmis.benchmarks.bmis_benchmark import run
+    run(env, contracts=50, lines=100, rounds=3, deliveries=2, output='bmis_benchmark.json')
+    EOF
+"""
+import json
+import logging
+import statistics
+import time
+from contextlib import contextmanager
+
+from odoo import fields
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+CONTRACT_REPORT_NAME = 'egp_bmis.report_construction_control'
+
+
+def generate(env, contracts=10, lines=50, rounds=2, deliveries=2):
+    """Create the synthetic dataset and return the generated contracts."""
+    proc_contract = env['proc.contract'].search([('proc_offer_id', '!=', False)], limit=1)
+    warehouse = env['stock.warehouse'].search([], limit=1)
+    if not proc_contract or not warehouse:
+        raise UserError("The benchmark needs a procurement contract with an offer and a warehouse.")
+
+    products = env['product.product'].create([
+        {'name': f"BMIS Benchmark Product {index}"} for index in range(lines)
+    ])
+    records = env['construction.control'].create([{
+        'contract_id': proc_contract.id,
+        'warehouse_id': warehouse.id,
+        'contract_number': f"BENCH-{index:06d}",
+        'contract_date': fields.Date.today(),
+        'state': 'in_progress',
+        'line_ids': [(0, 0, {
+            'product_id': product.id,
+            'unit_measure': product.uom_id.id,
+            'description': f"Benchmark item {product.id}",
+            'first_estimation_qty': 100.0,
+            'second_estimation_qty': 90.0,
+            'price': 10.0 + line_index,
+        }) for line_index, product in enumerate(products)],
+    } for index in range(contracts)])
+
+    env['construction.control.line.part'].create([{
+        'line_id': line.id,
+        'qty': 100.0 / (deliveries + 1),
+        'location': "Benchmark site",
+        'unit_of_measure': line.unit_measure.id,
+    } for line in records.line_ids for _delivery in range(deliveries)])
+
+    for _round in range(rounds):
+        records.action_send_to_quality_control()
+        qcs = records.construction_quality_ids.filtered(lambda q: q.state != 'done')
+        for line in qcs.line_ids:
+            line.write({'passed': True, 'approved_qty': line.product_uom_qty / rounds})
+        qcs.write({'state': 'done'})
+        records.action_send_to_property()
+        pcs = records.property_control_ids.filtered(lambda p: p.state != 'done')
+        pcs.write({'state': 'done'})
+    env.flush_all()
+    return records
+
+
+@contextmanager
+def _rollback(env):
+    """Run the block in a savepoint that is always rolled back."""
+    env.flush_all()
+    savepoint = env.cr.savepoint(flush=False)
+    try:
+        yield
+    finally:
+        savepoint.close(rollback=True)
+        env.invalidate_all()
+
+
+def measure(env, name, func, records, repeat=3):
+    """Time ``func`` ``repeat`` times on a cold cache, counting SQL queries."""
+    timings, queries, error = [], [], None
+    for _attempt in range(repeat):
+        with _rollback(env):
+            env.registry.clear_cache()
+            env.invalidate_all()
+            query_count = env.cr.sql_log_count
+            start = time.perf_counter()
+            try:
+                func(records)
+                env.flush_all()
+            except Exception as e:
+                error = str(e)
+                _logger.warning("Benchmark %s failed: %s", name, e)
+                break
+            timings.append(time.perf_counter() - start)
+            queries.append(env.cr.sql_log_count - query_count)
+    return {
+        'name': name,
+        'records': len(records),
+        'runs': len(timings),
+        'seconds_min': min(timings) if timings else None,
+        'seconds_median': statistics.median(timings) if timings else None,
+        'queries': max(queries) if queries else None,
+        'error': error,
+    }
+
+
+def _form_read(records):
+    arch, _view = records._get_view(view_type='form')
+    specification = {fname: {} for fname in arch.xpath('//field[not(ancestor::field)]/@name')}
+    records.web_read(specification)
+
+
+def _close_open_controls(records):
+    records.construction_quality_ids.filtered(lambda q: q.state != 'done').write({'state': 'done'})
+    records.property_control_ids.filtered(lambda p: p.state != 'done').write({'state': 'done'})
+
+
+def _send_to_quality_control(records):
+    _close_open_controls(records)
+    records.action_send_to_quality_control()
+
+
+def _send_to_property(records):
+    _close_open_controls(records)
+    records.action_send_to_property()
+
+
+HOT_PATHS = [
+    ('action_send_to_quality_control', _send_to_quality_control),
+    ('action_send_to_property', _send_to_property),
+    ('_compute_qc_summary_html', lambda records: records.mapped('qc_line_summary_html')),
+    ('_compute_pc_summary_html', lambda records: records.mapped('pc_line_summary_html')),
+    ('_compute_property_summary_html', lambda records: records.mapped('property_line_summary_html')),
+    ('_compute_control_counts', lambda records: records.mapped('qc_done_count')),
+    ('_compute_quality_lines', lambda records: records.mapped('quality_line_ids')),
+    ('form_read', lambda records: [_form_read(record) for record in records]),
+    ('report_html', lambda records: records.env['ir.actions.report']._render_qweb_html(
+        CONTRACT_REPORT_NAME, records.ids)),
+    ('report_pdf', lambda records: records.env['ir.actions.report']._render_qweb_pdf(
+        CONTRACT_REPORT_NAME, records.ids)),
+]
+
+
+def run(env, contracts=10, lines=50, rounds=2, deliveries=2, repeat=3,
+        output='bmis_benchmark.json', keep_data=False):
+    """Generate the dataset, benchmark every hot path and write the results to ``output``."""
+    start = time.perf_counter()
+    records = generate(env, contracts=contracts, lines=lines, rounds=rounds, deliveries=deliveries)
+    generation_time = time.perf_counter() - start
+
+    module = env['ir.module.module'].search([('name', '=', 'egp_bmis')])
+    results = {
+        'module_version': module.latest_version,
+        'date': fields.Datetime.to_string(fields.Datetime.now()),
+        'scale': {
+            'contracts': contracts,
+            'lines': lines,
+            'rounds': rounds,
+            'deliveries': deliveries,
+        },
+        'generation_seconds': generation_time,
+        'benchmarks': [measure(env, name, func, records, repeat=repeat) for name, func in HOT_PATHS],
+    }
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    _logger.info("BMIS benchmark written to %s", output)
+
+    if keep_data:
+        env.cr.commit()
+    else:
+        env.cr.rollback()
+    return results
@@ -0,0 +1,89 @@
+import csv
+import io
+import tempfile
+
+import xlsxwriter
+from werkzeug.wsgi import wrap_file
+
+from odoo import api, http, _
+from odoo.http import request, content_disposition
+
+# Flush the CSV buffer to the client every time it grows past this size.
+CSV_FLUSH_SIZE = 64 * 1024
+
+
+class ConstructionControlExport(http.Controller):
+
+    @http.route('/egp_bmis/construction_control/export', type='http', auth='user')
+    def export_construction_lines(self, ids, file_format='xlsx', **kwargs):
+        """Stream the bill of quantities of the given contracts as CSV or XLSX."""
+        contracts = request.env['construction.control'].browse(
+            [int(contract_id) for contract_id in ids.split(',') if contract_id]).exists()
+        contracts.check_access_rights('read')
+        contracts.check_access_rule('read')
+        filename = (contracts.contract_number if len(contracts) == 1 else None) or _("construction_lines")
+
+        if file_format == 'csv':
+            return request.make_response(self._stream_csv(contracts.ids), headers=[
+                ('Content-Type', 'text/csv; charset=utf-8'),
+                ('Content-Disposition', content_disposition(f"{filename}.csv")),
+            ])
+
+        fileobj = self._write_xlsx(contracts.ids)
+        return request.make_response(wrap_file(request.httprequest.environ, fileobj), headers=[
+            ('Content-Type', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+            ('Content-Disposition', content_disposition(f"{filename}.xlsx")),
+        ])
+
+    def _stream_csv(self, contract_ids):
+        """
+        Generator producing the CSV body. It runs after the request cursor is
+        closed, so it reads the lines through its own cursor.
+        """
+        registry, uid, context = request.env.registry, request.env.uid, dict(request.env.context)
+
+        def generate():
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                report = env['report.egp_bmis.report_construction_control']
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(report._get_export_header())
+                for row in report._iter_export_rows(contract_ids):
+                    writer.writerow(row)
+                    if buffer.tell() > CSV_FLUSH_SIZE:
+                        yield buffer.getvalue().encode()
+                        buffer.seek(0)
+                        buffer.truncate()
+                yield buffer.getvalue().encode()
+
+        return generate()
+
+    def _write_xlsx(self, contract_ids):
+        """
+        Write the workbook to a temporary file in constant memory mode, rows
+        are flushed to disk as they are written.
+        """
+        report = request.env['report.egp_bmis.report_construction_control']
+        fileobj = tempfile.TemporaryFile()
+        workbook = xlsxwriter.Workbook(fileobj, {'constant_memory': True})
+        worksheet = workbook.add_worksheet(_("Construction Lines"))
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, report._get_export_header(), bold)
+        for row_index, row in enumerate(report._iter_export_rows(contract_ids), start=1):
+            worksheet.write_row(row_index, 0, row)
+        workbook.close()
+        fileobj.seek(0)
+        return fileobj
+
+
+class ConstructionControlDeliveries(http.Controller):
+
+    @http.route('/egp_bmis/construction_control/deliveries', type='json', auth='user', methods=['POST'])
+    def submit_deliveries(self, deliveries, atomic=False, **kwargs):
+        """
+        Record a batch of partial deliveries in one request, see
+        ``construction.control.line.part._submit_batch`` for the row format.
+        """
+        return {'results': request.env['construction.control.line.part']._submit_batch(deliveries, atomic=atomic)}
+
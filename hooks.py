@@ -0,0 +1,3 @@
+def post_init_hook(env):
+    """Build the QC/PC ledger from the control history already in the database."""
+    env['construction.control.ledger']._rebuild()
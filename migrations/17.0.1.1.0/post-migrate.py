@@ -0,0 +1,7 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Fill the new QC/PC ledger from the existing control history."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['construction.control.ledger']._rebuild()
@@ -0,0 +1,7 @@
+from odoo.addons.egp_bmis.models.bmis_indexes import create_bmis_indexes_concurrently, get_bmis_indexes
+
+
+def migrate(cr, version):
+    """Build the contract number trigram index concurrently."""
+    cr.commit()
+    create_bmis_indexes_concurrently(cr.dbname, get_bmis_indexes('17.0.1.3.0'))
@@ -0,0 +1,17 @@
+from odoo import api, SUPERUSER_ID
+from odoo.tools import split_every
+
+RECONCILED_FIELDS = ('qc_approved_qty', 'qc_remaining_qty', 'pc_received_qty')
+
+
+def migrate(cr, version):
+    """Link the existing QC/PC lines to their construction line, then reconcile the lines."""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    Line = env['construction.control.line']
+    Line._link_control_lines()
+    for ids in split_every(1000, Line.search([]).ids):
+        lines = Line.browse(ids)
+        for fname in RECONCILED_FIELDS:
+            env.add_to_compute(Line._fields[fname], lines)
+        lines.flush_recordset(list(RECONCILED_FIELDS))
+        env.invalidate_all()
@@ -0,0 +1,11 @@
+from odoo.tools.sql import column_exists, create_column
+
+
+def migrate(cr, version):
+    """
+    Add the construction line link of the QC/PC lines before the ORM does,
+    its index is built concurrently by the end-migration.
+    """
+    for table in ('quality_control_line', 'property_control_line'):
+        if not column_exists(cr, table, 'construction_line_id'):
+            create_column(cr, table, 'construction_line_id', 'int4')
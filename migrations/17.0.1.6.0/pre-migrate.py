@@ -0,0 +1,7 @@
+def migrate(cr, version):
+    """
+    Add the active columns with a constant default, which PostgreSQL stores
+    without rewriting the tables; their partial indexes are built by the end-migration.
+    """
+    for table in ('construction_control', 'construction_control_line'):
+        cr.execute('ALTER TABLE "%s" ADD COLUMN IF NOT EXISTS active boolean DEFAULT true' % table)
@@ -0,0 +1,8 @@
+from odoo.addons.egp_bmis.models.bmis_indexes import create_bmis_indexes_concurrently, get_bmis_indexes
+
+
+def migrate(cr, version):
+    """Replace the open end date index by one whose predicate the ORM domains can match."""
+    cr.execute('DROP INDEX IF EXISTS construction_control_open_end_date_index')
+    cr.commit()
+    create_bmis_indexes_concurrently(cr.dbname, get_bmis_indexes('17.0.1.8.0'))
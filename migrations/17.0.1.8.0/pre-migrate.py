@@ -0,0 +1,15 @@
+from odoo.tools.sql import column_exists, create_column, table_exists
+
+
+def migrate(cr, version):
+    """Copy the product of the construction lines on their revisions, which now outlive the lines."""
+    if not table_exists(cr, 'construction_control_line_revision') \
+            or column_exists(cr, 'construction_control_line_revision', 'product_id'):
+        return
+    create_column(cr, 'construction_control_line_revision', 'product_id', 'int4')
+    cr.execute("""
+        UPDATE construction_control_line_revision r
+           SET product_id = l.product_id
+          FROM construction_control_line l
+         WHERE l.id = r.line_id
+    """)
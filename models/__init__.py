@@ -1,3 +1,14 @@
 from . import construction_pro
 from . import board_members
-from . import construction_control_line_part
\ No newline at end of file
+from . import construction_control_line_part
+from . import construction_control_ledger
+from . import inventory_control
+from . import construction_control_report
+from . import construction_control_print_batch
+from . import construction_control_snapshot
+from . import bmis_perf_log
+from . import construction_control_dispatch_job
+from . import hr_employee
+from . import construction_control_value_report
+from . import construction_control_line_revision
+from . import res_users
@@ -0,0 +1,228 @@
+"""
+Indexes of the module. They are declared here rather than with ``index=True``
+on the fields, under the name the ORM would give them, so that the ORM never
+builds them itself while the tables are locked by an upgrade.
+
+Every index of an existing table carries the module ``version`` that
+introduced it. The ``init()`` of the model creates it on install and on plain
+updates; an upgrade from an older version leaves it to the end-migration of
+that version, which builds it concurrently once the upgrade is loaded.
+"""
+import contextlib
+import logging
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from odoo.sql_db import db_connect
+from odoo.tools import mute_logger, parse_version
+from odoo.tools.sql import create_index, index_exists, table_exists
+
+_logger = logging.getLogger(__name__)
+
+# States of the open contracts. The ORM adds ``OR state IS NULL`` to a
+# ``('state', '!=', 'done')`` leaf, so the domains that the partial index below
+# must serve state ``('state', 'in', CONTRACT_OPEN_STATES)`` instead.
+CONTRACT_OPEN_STATES = ('draft', 'in_progress')
+
+BMIS_INDEXES = [
+    # contract lines, partial deliveries and board members of a contract
+    {
+        'name': 'construction_control_line__construction_control_id_index',
+        'version': '17.0.1.2.0',
+        'table': 'construction_control_line',
+        'expressions': ['construction_control_id'],
+    },
+    {
+        # delivery history of a line, in date order; also serves the lookups by line
+        'name': 'construction_control_line_part_line_id_delivery_date_index',
+        'version': '17.0.1.2.0',
+        'table': 'construction_control_line_part',
+        'expressions': ['line_id', 'delivery_date'],
+    },
+    {
+        'name': 'const_board_member__const_control_id_index',
+        'version': '17.0.1.2.0',
+        'table': 'const_board_member',
+        'expressions': ['const_control_id'],
+    },
+    {
+        # contracts an employee sits on the board of
+        'name': 'const_board_member__employee_id_index',
+        'version': '17.0.1.4.0',
+        'table': 'const_board_member',
+        'expressions': ['employee_id'],
+    },
+    # contract list filters
+    {
+        'name': 'construction_control__state_index',
+        'version': '17.0.1.2.0',
+        'table': 'construction_control',
+        'expressions': ['state'],
+    },
+    # record rules of the project managers and warehouse users
+    {
+        'name': 'construction_control__Project_manager_index',
+        'version': '17.0.1.7.0',
+        'table': 'construction_control',
+        'expressions': ['"Project_manager"'],
+    },
+    {
+        'name': 'construction_control__warehouse_id_index',
+        'version': '17.0.1.7.0',
+        'table': 'construction_control',
+        'expressions': ['warehouse_id'],
+    },
+    {
+        # contract number fragments typed in dropdowns and the search bar (index='trigram')
+        'name': 'construction_control__contract_number_index',
+        'version': '17.0.1.3.0',
+        'table': 'construction_control',
+        'expressions': ['contract_number gin_trgm_ops'],
+        'method': 'gin',
+        'extension': 'pg_trgm',
+    },
+    {
+        # open contracts by end date: overdue filter and deadline checks
+        'name': 'construction_control_open_states_end_date_index',
+        'version': '17.0.1.8.0',
+        'table': 'construction_control',
+        'expressions': ['contract_end_date'],
+        'where': "state IN (%s)" % ", ".join("'%s'" % state for state in CONTRACT_OPEN_STATES),
+    },
+    # live rows only: the default active_test domain of lists, searches and dispatch
+    {
+        'name': 'construction_control_active_state_index',
+        'version': '17.0.1.6.0',
+        'table': 'construction_control',
+        'expressions': ['state'],
+        'where': 'active',
+    },
+    {
+        'name': 'construction_control_line_active_construction_control_id_index',
+        'version': '17.0.1.6.0',
+        'table': 'construction_control_line',
+        'expressions': ['construction_control_id'],
+        'where': 'active',
+    },
+    # QC/PC of a contract, per state: One2many reads, counters and the open control checks
+    {
+        'name': 'quality_control_const_contract_id_state_index',
+        'version': '17.0.1.2.0',
+        'table': 'quality_control',
+        'expressions': ['const_contract_id', 'state'],
+    },
+    {
+        'name': 'property_control_const_contract_id_state_index',
+        'version': '17.0.1.2.0',
+        'table': 'property_control',
+        'expressions': ['const_contract_id', 'state'],
+    },
+    # estimation revisions: changes since a date, for all contracts or one contract
+    {
+        'name': 'construction_control_line_revision_date_index',
+        'table': 'construction_control_line_revision',
+        'expressions': ['date'],
+    },
+    {
+        'name': 'construction_control_line_revision_contract_id_date_index',
+        'table': 'construction_control_line_revision',
+        'expressions': ['contract_id', 'date'],
+    },
+    # QC/PC lines dispatched for a construction line
+    {
+        'name': 'quality_control_line__construction_line_id_index',
+        'version': '17.0.1.5.0',
+        'table': 'quality_control_line',
+        'expressions': ['construction_line_id'],
+    },
+    {
+        'name': 'property_control_line__construction_line_id_index',
+        'version': '17.0.1.5.0',
+        'table': 'property_control_line',
+        'expressions': ['construction_line_id'],
+    },
+]
+
+
+def _extension_installed(cr, index, autocommit=False):
+    """
+    Whether the extension ``index`` relies on is installed, creating it when
+    the database user is allowed to. A skipped index is logged, the searches
+    it serves then scan the table.
+    """
+    extension = index.get('extension')
+    if not extension:
+        return True
+    cr.execute("SELECT 1 FROM pg_extension WHERE extname = %s", [extension])
+    if cr.fetchone():
+        return True
+    try:
+        with mute_logger('odoo.sql_db'), \
+                (contextlib.nullcontext() if autocommit else cr.savepoint(flush=False)):
+            cr.execute('CREATE EXTENSION IF NOT EXISTS "%s"' % extension)
+        return True
+    except psycopg2.Error:
+        _logger.warning(
+            "Index %s is not created: the PostgreSQL extension %s is missing and the database user "
+            "cannot create it. Install it with CREATE EXTENSION %s.", index['name'], extension, extension)
+        return False
+
+
+def _upgraded_version(cr):
+    """Version the module is being upgraded from, ``None`` outside of an upgrade."""
+    cr.execute("""
+        SELECT latest_version FROM ir_module_module
+         WHERE name = 'egp_bmis' AND state = 'to upgrade'
+    """)
+    row = cr.fetchone()
+    return row and row[0] and parse_version(row[0])
+
+
+def get_bmis_indexes(version):
+    """Indexes introduced by the module ``version``, built by its migration."""
+    return [index for index in BMIS_INDEXES if index.get('version') == version]
+
+
+def create_bmis_indexes(cr, table):
+    """Create the missing indexes of ``table``, from the ``init()`` of its model."""
+    upgraded_version = _upgraded_version(cr)
+    for index in BMIS_INDEXES:
+        if index['table'] != table or not _extension_installed(cr, index):
+            continue
+        if upgraded_version and index.get('version') and parse_version(index['version']) > upgraded_version:
+            # built concurrently by the end-migration of its version
+            continue
+        create_index(cr, index['name'], table, index['expressions'],
+                     method=index.get('method', 'btree'), where=index.get('where', ''))
+
+
+def create_bmis_indexes_concurrently(dbname, indexes=BMIS_INDEXES):
+    """
+    Build the missing ``indexes`` with CREATE INDEX CONCURRENTLY, on a
+    dedicated autocommit connection. The calling transaction must have been
+    committed first, otherwise the build waits for it forever. Missing tables
+    are skipped and invalid leftovers rebuilt, so that it can run again.
+    """
+    with db_connect(dbname).cursor() as cr:
+        cr._cnx.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        for index in indexes:
+            if not table_exists(cr, index['table']) or not _extension_installed(cr, index, autocommit=True):
+                continue
+            # left over by an interrupted concurrent build
+            cr.execute("""
+                SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                 WHERE c.relname = %s AND NOT i.indisvalid
+            """, [index['name']])
+            if cr.fetchone():
+                cr.execute('DROP INDEX CONCURRENTLY IF EXISTS "%s"' % index['name'])
+            if index_exists(cr, index['name']):
+                continue
+            _logger.info("Creating index %s concurrently", index['name'])
+            cr.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS "%s" ON "%s" USING %s (%s)%s' % (
+                index['name'],
+                index['table'],
+                index.get('method', 'btree'),
+                ', '.join(index['expressions']),
+                ' WHERE %s' % index['where'] if index.get('where') else '',
+            ))
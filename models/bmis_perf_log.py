@@ -0,0 +1,96 @@
+import functools
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# System parameters: set PERF_LOG_PARAM to a true value to enable the instrumentation.
+PERF_LOG_PARAM = 'egp_bmis.perf_logging'
+PERF_LOG_RETENTION_PARAM = 'egp_bmis.perf_log_retention_days'
+PERF_LOG_DEFAULT_RETENTION = 30
+# Upper bound of log rows kept by the rotation cron.
+PERF_LOG_MAX_ROWS = 200000
+
+
+def bmis_instrumented(method):
+    """
+    Record the wall time, SQL query count and time and the record count of
+    each successful call of ``method`` in ``egp.bmis.perf.log``, when enabled.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        PerfLog = self.env['egp.bmis.perf.log']
+        if not PerfLog._is_enabled():
+            return method(self, *args, **kwargs)
+        thread = threading.current_thread()
+        if not hasattr(thread, 'query_time'):
+            # only HTTP requests set these, the cursor updates them when present
+            thread.query_count = 0
+            thread.query_time = 0.0
+        query_count = self.env.cr.sql_log_count
+        query_time = thread.query_time
+        start = time.perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            # the transaction may be aborted: failed calls only go to the server log
+            _logger.info("%s.%s failed after %.0f ms", self._name, method.__name__,
+                         (time.perf_counter() - start) * 1000)
+            raise
+        PerfLog._log(
+            self._name,
+            method.__name__,
+            duration=(time.perf_counter() - start) * 1000,
+            query_count=self.env.cr.sql_log_count - query_count,
+            query_time=(thread.query_time - query_time) * 1000,
+            record_count=len(self),
+        )
+        return result
+    return wrapper
+
+
+class BmisPerfLog(models.Model):
+    """
+    Lightweight log of the instrumented BMIS actions, computes and reports,
+    rotated by a cron.
+    """
+    _name = 'egp.bmis.perf.log'
+    _description = 'BMIS Performance Log'
+    _order = 'id desc'
+    _rec_name = 'method'
+    _log_access = False
+
+    date = fields.Datetime(string='Date', required=True, index=True, default=fields.Datetime.now)
+    model = fields.Char(string='Model', required=True)
+    method = fields.Char(string='Method', required=True)
+    user_id = fields.Many2one('res.users', string='User', ondelete='set null')
+    duration = fields.Float(string='Duration (ms)', group_operator='avg')
+    query_count = fields.Integer(string='SQL Queries', group_operator='avg')
+    query_time = fields.Float(string='SQL Time (ms)', group_operator='avg')
+    record_count = fields.Integer(string='Records', group_operator='avg')
+
+    @api.model
+    def _is_enabled(self):
+        return bool(self.env['ir.config_parameter'].sudo().get_param(PERF_LOG_PARAM))
+
+    @api.model
+    def _log(self, model, method, **values):
+        self.sudo().create(dict(values, model=model, method=method, user_id=self.env.uid))
+
+    @api.model
+    def _cron_rotate(self):
+        """Drop the rows older than the retention period, then keep at most PERF_LOG_MAX_ROWS rows."""
+        retention = int(self.env['ir.config_parameter'].sudo().get_param(
+            PERF_LOG_RETENTION_PARAM, PERF_LOG_DEFAULT_RETENTION))
+        self.flush_model()
+        self.env.cr.execute("DELETE FROM egp_bmis_perf_log WHERE date < %s",
+                            [fields.Datetime.now() - timedelta(days=retention)])
+        self.env.cr.execute("""
+            DELETE FROM egp_bmis_perf_log
+             WHERE id <= (SELECT id FROM egp_bmis_perf_log ORDER BY id DESC OFFSET %s LIMIT 1)
+        """, [PERF_LOG_MAX_ROWS])
+        self.invalidate_model()
@@ -8,14 +8,17 @@ Description: 这是默认设置,可以在设置》工具》File Description中
 """
 from odoo import models, fields, api, _
 
+from .bmis_indexes import create_bmis_indexes
+
 class ConstBoardMember(models.Model):
     _name = "const.board.member"
     _inherit = ['mail.thread', 'mail.activity.mixin']
     _description = "Const Board Members"
 
-    position_title = fields.Char(string='Position', related='employee_id.job_id.name', store=True)
-    phone = fields.Char(string='Phone', related='employee_id.work_phone', store=True)
-    email = fields.Char(string='Email', related='employee_id.work_email', store=True)
+    # not stored: HR updates of the employees must not rewrite every board membership
+    position_title = fields.Char(string='Position', related='employee_id.job_id.name')
+    phone = fields.Char(string='Phone', related='employee_id.work_phone')
+    email = fields.Char(string='Email', related='employee_id.work_email')
     # role = fields.Selection([('pre_offer_opening', 'Pre Offer Opening'),
     #                          ('offer_opening', 'Offer Opening'),
     #                          ('evaluation', 'Evaluation'),
@@ -29,5 +32,8 @@ class ConstBoardMember(models.Model):
     employee_id = fields.Many2one('hr.employee', string="Employee", tracking=True)
     const_control_id = fields.Many2one('construction.control', string="Board Member", tracking=True)
 
+    def init(self):
+        create_bmis_indexes(self._cr, self._table)
+
 
 
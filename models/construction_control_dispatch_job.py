@@ -0,0 +1,150 @@
+import logging
+from datetime import timedelta
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+# Contracts dispatched per committed chunk.
+DISPATCH_CHUNK_SIZE = 50
+
+# Minutes before a job interrupted by an unexpected error is retried.
+DISPATCH_RETRY_DELAY = 5
+
+DISPATCH_METHODS = {
+    'qc': 'action_send_to_quality_control',
+    'property': 'action_send_to_property',
+}
+
+
+class ConstructionControlDispatchJob(models.Model):
+    """
+    Queued dispatch of a contract selection to Quality Control or Property.
+    Jobs are processed by a cron in committed chunks; contracts refused by the
+    dispatch are recorded as failed, unexpected errors are retried.
+    """
+    _name = 'construction.control.dispatch.job'
+    _description = 'Construction Control Dispatch Job'
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Name',
+        required=True,
+        readonly=True,
+        default=lambda self: _("Dispatch %s", fields.Datetime.to_string(fields.Datetime.now()))
+    )
+    kind = fields.Selection([
+        ('qc', 'Quality Control'),
+        ('property', 'Property'),
+    ], string='Send To', required=True, readonly=True)
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user
+    )
+    contract_ids = fields.Many2many(
+        'construction.control',
+        'construction_control_dispatch_job_contract_rel',
+        'job_id', 'contract_id',
+        string='Contracts',
+        readonly=True
+    )
+    done_contract_ids = fields.Many2many(
+        'construction.control',
+        'construction_control_dispatch_job_done_rel',
+        'job_id', 'contract_id',
+        string='Dispatched Contracts',
+        readonly=True
+    )
+    failed_contract_ids = fields.Many2many(
+        'construction.control',
+        'construction_control_dispatch_job_failed_rel',
+        'job_id', 'contract_id',
+        string='Failed Contracts',
+        readonly=True
+    )
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, readonly=True, index=True)
+    progress = fields.Float(string='Progress', readonly=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    max_attempts = fields.Integer(string='Max Attempts', default=3)
+    error = fields.Text(string='Errors', readonly=True)
+
+    @api.model
+    def _enqueue(self, contracts, kind):
+        """Queue the dispatch of ``contracts`` and wake up the dispatch cron."""
+        job = self.create({'kind': kind, 'contract_ids': [(6, 0, contracts.ids)]})
+        self.env.ref('egp_bmis.ir_cron_process_dispatch_jobs')._trigger()
+        return job
+
+    def action_retry(self):
+        self.write({
+            'state': 'queued',
+            'attempts': 0,
+            'failed_contract_ids': [(5, 0, 0)],
+            'error': False,
+        })
+        self.env.ref('egp_bmis.ir_cron_process_dispatch_jobs')._trigger()
+
+    def _log_error(self, message):
+        self.error = "%s\n%s" % (self.error, message) if self.error else message
+
+    def _update_progress(self):
+        processed = len(self.done_contract_ids) + len(self.failed_contract_ids)
+        self.progress = 100.0 * processed / len(self.contract_ids) if self.contract_ids else 100.0
+
+    @api.model
+    def _cron_process_jobs(self):
+        for job in self.search([('state', 'in', ('queued', 'running'))], order='id'):
+            job._process()
+
+    def _process(self):
+        """Dispatch the remaining contracts of the job, committing after every chunk."""
+        self.ensure_one()
+        self.state = 'running'
+        self.env.cr.commit()
+        method = DISPATCH_METHODS[self.kind]
+        while True:
+            remaining = self.contract_ids - self.done_contract_ids - self.failed_contract_ids
+            if not remaining:
+                break
+            chunk = remaining[:DISPATCH_CHUNK_SIZE]
+            try:
+                try:
+                    with self.env.cr.savepoint():
+                        getattr(chunk.with_user(self.user_id), method)()
+                    self.done_contract_ids |= chunk
+                except (UserError, ValidationError):
+                    # isolate the contracts refused by the dispatch, the others go through
+                    for contract in chunk:
+                        try:
+                            with self.env.cr.savepoint():
+                                getattr(contract.with_user(self.user_id), method)()
+                            self.done_contract_ids |= contract
+                        except (UserError, ValidationError) as e:
+                            self.failed_contract_ids |= contract
+                            self._log_error("%s: %s" % (contract.contract_number or contract.id, e))
+            except Exception as e:
+                _logger.exception("Dispatch job %s failed", self.name)
+                self.env.invalidate_all()
+                self.attempts += 1
+                self._log_error(str(e))
+                if self.attempts >= self.max_attempts:
+                    self.state = 'failed'
+                else:
+                    self.state = 'queued'
+                    self.env.ref('egp_bmis.ir_cron_process_dispatch_jobs')._trigger(
+                        fields.Datetime.now() + timedelta(minutes=DISPATCH_RETRY_DELAY))
+                self.env.cr.commit()
+                return
+            self._update_progress()
+            self.env.cr.commit()
+        self.state = 'failed' if self.failed_contract_ids and not self.done_contract_ids else 'done'
+        self.env.cr.commit()
@@ -0,0 +1,207 @@
+from odoo import models, fields, api
+from collections import defaultdict
+
+# source -> (control model, control line model, domain of the approved lines)
+LEDGER_SOURCES = {
+    'qc': ('quality.control', 'quality.control.line', [('passed', '=', True)]),
+    'pc': ('property.control', 'property.control.line', [('state', '=', 'done')]),
+}
+
+# precommit data holding the ledger keys to refresh, per source
+LEDGER_PENDING_KEY = 'egp_bmis.ledger.pending'
+
+
+class ConstructionControlLedger(models.Model):
+    """
+    Pre-aggregated approved QC/PC quantities per contract and product.
+    The control lines queue the (contract, product) rows they touch, which are
+    refreshed once before the commit, so the contract summaries never have to
+    scan the whole QC/PC history.
+    """
+    _name = 'construction.control.ledger'
+    _description = 'Construction Control QC/PC Ledger'
+    _order = 'contract_id, source, product_id'
+
+    contract_id = fields.Many2one(
+        'construction.control',
+        string='Construction Control',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+    product_id = fields.Many2one('product.product', string='Product', required=True, ondelete='cascade')
+    source = fields.Selection([
+        ('qc', 'Quality Control'),
+        ('pc', 'Property Control'),
+    ], string='Source', required=True)
+    approved_qty = fields.Float(string='Approved Qty')
+    rejected_qty = fields.Float(string='Not Approved Qty')
+    price_total = fields.Float(string='Price Total', help='Sum of the unit prices of the approved lines.')
+    approved_value = fields.Float(string='Approved Value', help='Approved quantity × unit price.')
+    line_count = fields.Integer(string='Line Count')
+
+    _sql_constraints = [
+        ('contract_product_source_uniq', 'unique(contract_id, product_id, source)',
+         'Only one ledger row is allowed per contract, product and source.'),
+    ]
+
+    @api.model
+    def _parent_field(self, source):
+        """Name of the many2one linking a control line to its control record."""
+        control_model = LEDGER_SOURCES[source][0]
+        return self.env[control_model]._fields['line_ids'].inverse_name
+
+    @api.model
+    def _aggregate(self, source, domain):
+        """
+        Aggregate the approved control lines matching ``domain`` with one grouped query.
+        Returns a dict {(contract_id, product_id): ledger values}.
+        """
+        line_model, approved_domain = LEDGER_SOURCES[source][1:]
+        parent = self._parent_field(source)
+        groups = self.env[line_model].sudo()._read_group(
+            approved_domain + domain + [(f'{parent}.const_contract_id', '!=', False), ('product_id', '!=', False)],
+            groupby=[parent, 'product_id', 'price_unit'],
+            aggregates=['approved_qty:sum', 'product_uom_qty:sum', '__count'],
+        )
+        result = defaultdict(lambda: {
+            'approved_qty': 0.0,
+            'rejected_qty': 0.0,
+            'price_total': 0.0,
+            'approved_value': 0.0,
+            'line_count': 0,
+        })
+        for control, product, price_unit, approved_qty, uom_qty, count in groups:
+            data = result[(control.const_contract_id.id, product.id)]
+            data['approved_qty'] += approved_qty or 0.0
+            data['rejected_qty'] += (uom_qty or 0.0) - (approved_qty or 0.0)
+            data['price_total'] += (price_unit or 0.0) * count
+            data['approved_value'] += (approved_qty or 0.0) * (price_unit or 0.0)
+            data['line_count'] += count
+        return result
+
+    @api.model
+    def _refresh(self, source, keys):
+        """
+        Recompute the ledger rows of ``source`` for the given (contract_id, product_id) keys.
+        Only rows whose aggregates actually changed are written.
+        """
+        contract_ids = list({contract_id for contract_id, _product_id in keys})
+        product_ids = list({product_id for _contract_id, product_id in keys})
+        parent = self._parent_field(source)
+        values = self._aggregate(source, [
+            (f'{parent}.const_contract_id', 'in', contract_ids),
+            ('product_id', 'in', product_ids),
+        ])
+        ledgers = self.sudo().search([
+            ('source', '=', source),
+            ('contract_id', 'in', contract_ids),
+            ('product_id', 'in', product_ids),
+        ])
+        # the search covers every contract x product pair, keep the touched keys only
+        self._apply(
+            source,
+            ledgers.filtered(lambda l: (l.contract_id.id, l.product_id.id) in keys),
+            {key: vals for key, vals in values.items() if key in keys},
+        )
+
+    @api.model
+    def _add_pending(self, source, keys):
+        """Queue the (contract_id, product_id) keys of ``source``, refreshed by the precommit hook."""
+        keys = {(contract_id, product_id) for contract_id, product_id in keys if contract_id and product_id}
+        if not keys:
+            return
+        precommit = self.env.cr.precommit
+        pending = precommit.data.get(LEDGER_PENDING_KEY)
+        if pending is None:
+            pending = precommit.data[LEDGER_PENDING_KEY] = defaultdict(set)
+            precommit.add(self._flush_pending)
+        pending[source] |= keys
+
+    @api.model
+    def _flush_pending(self):
+        """Refresh the queued ledger rows, once the control lines and their stored computes are flushed."""
+        pending = self.env.cr.precommit.data.pop(LEDGER_PENDING_KEY, None)
+        if not pending:
+            return
+        self.env.flush_all()
+        for source, keys in pending.items():
+            self._refresh(source, keys)
+        self.flush_model()
+
+    @api.model
+    def _rebuild(self, contract_ids=None):
+        """Rebuild the ledger from scratch, for all contracts or only ``contract_ids``."""
+        for source in LEDGER_SOURCES:
+            ledger_domain = [('source', '=', source)]
+            line_domain = []
+            if contract_ids is not None:
+                ledger_domain.append(('contract_id', 'in', contract_ids))
+                line_domain.append((f'{self._parent_field(source)}.const_contract_id', 'in', contract_ids))
+            self._apply(source, self.sudo().search(ledger_domain), self._aggregate(source, line_domain))
+
+    @api.model
+    def _apply(self, source, ledgers, values):
+        """Write ``values`` over the existing ``ledgers`` rows, dropping the ones left empty."""
+        values = dict(values)
+        obsolete = ledgers.browse()
+        for ledger in ledgers:
+            vals = values.pop((ledger.contract_id.id, ledger.product_id.id), None)
+            if vals is None:
+                obsolete |= ledger
+                continue
+            changed = {fname: value for fname, value in vals.items() if ledger[fname] != value}
+            if changed:
+                ledger.write(changed)
+        obsolete.unlink()
+        if values:
+            self.sudo().create([
+                dict(vals, contract_id=contract_id, product_id=product_id, source=source)
+                for (contract_id, product_id), vals in values.items()
+            ])
+
+
+class ConstructionControlLedgerMixin(models.AbstractModel):
+    """
+    Hooks queueing the ledger rows touched by the QC/PC control models and
+    their lines. The rows are refreshed before the commit, after the stored
+    computes of the lines have been flushed.
+    """
+    _name = 'construction.control.ledger.mixin'
+    _description = 'Construction Control Ledger Hooks'
+
+    # 'qc' or 'pc', see LEDGER_SOURCES
+    _ledger_source = None
+    # fields whose update changes the ledger, None for all of them
+    _ledger_trigger_fields = None
+
+    def _ledger_lines(self):
+        """Control lines affected by a change on ``self``."""
+        return self
+
+    def _ledger_queue(self):
+        parent = self.env['construction.control.ledger']._parent_field(self._ledger_source)
+        self.env['construction.control.ledger']._add_pending(self._ledger_source, {
+            (line[parent].const_contract_id.id, line.product_id.id)
+            for line in self._ledger_lines().sudo()
+        })
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._ledger_queue()
+        return records
+
+    def write(self, vals):
+        if self._ledger_trigger_fields is not None and not set(vals) & set(self._ledger_trigger_fields):
+            return super().write(vals)
+        # the rows of the lines before and after a move to another contract or product
+        self._ledger_queue()
+        res = super().write(vals)
+        self._ledger_queue()
+        return res
+
+    def unlink(self):
+        # also queues the lines of the control records, deleted by the database cascade
+        self._ledger_queue()
+        return super().unlink()
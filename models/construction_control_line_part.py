@@ -1,7 +1,16 @@
+import math
+
+from psycopg2 import errors
+
 from odoo import models, fields, api, _
 from odoo.exceptions import UserError, ValidationError
 from collections import defaultdict
 
+from .bmis_indexes import create_bmis_indexes
+
+# Deliveries accepted per batch submission.
+DELIVERY_BATCH_MAX = 1000
+
 class ConstructionControlLinePart(models.Model):
     _name = 'construction.control.line.part'
     _description = 'Partial Delivery of Construction Line'
@@ -17,3 +26,158 @@ class ConstructionControlLinePart(models.Model):
         tracking=True,
         help="Unit of measurement for this item."
     )
+    idempotency_key = fields.Char(
+        string='Idempotency Key',
+        readonly=True,
+        copy=False,
+        help='Key sent by offline clients with a delivery, so that resubmitting it never creates a duplicate.'
+    )
+
+    _sql_constraints = [
+        ('idempotency_key_uniq', 'unique(idempotency_key)', 'This delivery has already been submitted.'),
+    ]
+
+    def init(self):
+        create_bmis_indexes(self._cr, self._table)
+
+    @api.model
+    def _check_delivery(self, delivery, line, uom, qty):
+        """Error message of a submitted delivery, or None when it is valid."""
+        if not line:
+            return _("Unknown construction line %s.", delivery.get('line_id'))
+        if line.construction_control_id.state != 'in_progress':
+            return _("Contract %s is not in progress.", line.construction_control_id.contract_number or '')
+        if not math.isfinite(qty) or qty <= 0:
+            return _("The delivered quantity must be positive.")
+        location = delivery.get('location')
+        if not isinstance(location, str) or not location.strip():
+            return _("The location is required.")
+        if delivery.get('notes') and not isinstance(delivery['notes'], str):
+            return _("The notes must be a text.")
+        if delivery.get('unit_of_measure_id') and not uom:
+            return _("Unknown unit of measure %s.", delivery['unit_of_measure_id'])
+        if uom and line.unit_measure and uom.category_id != line.unit_measure.category_id:
+            return _("Unit of measure %s cannot be converted to %s.", uom.name, line.unit_measure.name)
+        return None
+
+    @api.model
+    def _get_parts_by_key(self, keys):
+        """Map idempotency key -> id of the part submitted with it, for all users."""
+        if not keys:
+            return {}
+        return {
+            part['idempotency_key']: part['id']
+            for part in self.sudo().search_read([('idempotency_key', 'in', keys)], ['idempotency_key'])
+        }
+
+    @api.model
+    def _create_parts(self, vals_list):
+        """
+        Create the parts of ``vals_list`` with a single ``create``, and return
+        one (part id, duplicate) pair per row. When a key was submitted by a
+        concurrent request in the meantime, the rows are created one by one
+        and the rows whose key is taken resolve to the existing part.
+        """
+        try:
+            with self.env.cr.savepoint():
+                return [(part.id, False) for part in self.create(vals_list)]
+        except errors.UniqueViolation:
+            self.env.invalidate_all()
+        result = []
+        for vals in vals_list:
+            try:
+                with self.env.cr.savepoint():
+                    result.append((self.create(vals).id, False))
+            except errors.UniqueViolation:
+                self.env.invalidate_all()
+                # a part committed after this transaction started has no id to report
+                key = vals['idempotency_key']
+                result.append((self._get_parts_by_key([key]).get(key, False), True))
+        return result
+
+    @api.model
+    def _submit_batch(self, deliveries, atomic=False):
+        """
+        Validate and create a batch of partial deliveries, as sent by the field
+        engineers. Each delivery is a dict with ``line_id``, ``qty``,
+        ``location`` and optionally ``delivery_date``, ``unit_of_measure_id``,
+        ``notes`` and ``idempotency_key``. All the rows are validated together
+        and the valid ones created with a single ``create``; with ``atomic``
+        nothing is created as soon as one row is invalid.
+
+        Returns one result per delivery, in order: ``{'status': 'created' |
+        'duplicate' | 'skipped' | 'error', 'id': part id, 'error': message}``.
+        """
+        if not isinstance(deliveries, list):
+            raise UserError(_("The deliveries must be sent as a list."))
+        if len(deliveries) > DELIVERY_BATCH_MAX:
+            raise UserError(_("At most %s deliveries can be submitted at once.", DELIVERY_BATCH_MAX))
+
+        deliveries = [delivery if isinstance(delivery, dict) else None for delivery in deliveries]
+        valid = [d for d in deliveries if d is not None]
+        # the keys are looked up as superuser: a key is a duplicate even when its
+        # part belongs to a contract the submitting user cannot see
+        existing = self._get_parts_by_key(
+            [d['idempotency_key'] for d in valid if isinstance(d.get('idempotency_key'), str)])
+        lines = self.env['construction.control.line'].search(
+            [('id', 'in', [d.get('line_id') for d in valid if isinstance(d.get('line_id'), int)])])
+        uoms = self.env['uom.uom'].browse(
+            [d['unit_of_measure_id'] for d in valid if isinstance(d.get('unit_of_measure_id'), int)]).exists()
+
+        results, vals_list, created_rows, seen_keys = [], [], [], {}
+        for index, delivery in enumerate(deliveries):
+            if delivery is None:
+                results.append({'status': 'error', 'error': _("A delivery must be an object.")})
+                continue
+            key = delivery.get('idempotency_key') or False
+            if key and not isinstance(key, str):
+                results.append({'status': 'error', 'error': _("The idempotency key must be a text.")})
+                continue
+            if key in existing:
+                results.append({'status': 'duplicate', 'id': existing[key]})
+                continue
+            if key in seen_keys:
+                # resent within the same batch, resolved once the first one is created
+                results.append({'status': 'duplicate', 'row': seen_keys[key]})
+                continue
+            line = lines.browse(delivery['line_id']) if delivery.get('line_id') in lines.ids else lines.browse()
+            uom_id = delivery.get('unit_of_measure_id')
+            uom = uoms.browse(uom_id) if uom_id in uoms.ids else uoms.browse()
+            try:
+                qty = float(delivery.get('qty') or 0.0)
+                delivery_date = fields.Date.to_date(delivery.get('delivery_date')) or fields.Date.context_today(self)
+            except (TypeError, ValueError):
+                results.append({'status': 'error', 'error': _("Invalid quantity or delivery date.")})
+                continue
+            error = self._check_delivery(delivery, line, uom, qty)
+            if error:
+                results.append({'status': 'error', 'error': error})
+                continue
+            if key:
+                seen_keys[key] = index
+            created_rows.append(index)
+            results.append({'status': 'created'})
+            vals_list.append({
+                'line_id': line.id,
+                'qty': qty,
+                'delivery_date': delivery_date,
+                'location': delivery['location'].strip(),
+                'unit_of_measure': (uom or line.unit_measure).id,
+                'notes': delivery.get('notes') or False,
+                'idempotency_key': key,
+            })
+
+        if atomic and any(result['status'] == 'error' for result in results):
+            return [
+                {'status': 'skipped'} if result['status'] == 'created' or 'row' in result else result
+                for result in results
+            ]
+        for index, (part_id, duplicate) in zip(created_rows, self._create_parts(vals_list)):
+            results[index]['id'] = part_id
+            if duplicate:
+                results[index]['status'] = 'duplicate'
+        for result in results:
+            if 'row' in result:
+                result['id'] = results[result.pop('row')]['id']
+        return results
+
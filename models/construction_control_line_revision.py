@@ -0,0 +1,103 @@
+from odoo import models, fields, api
+
+from .bmis_indexes import create_bmis_indexes
+
+# line fields whose changes are recorded, with their old_/new_ revision columns
+REVISION_FIELDS = ['first_estimation_qty', 'second_estimation_qty', 'price']
+
+
+class ConstructionControlLineRevision(models.Model):
+    """
+    Append-only log of the estimation and price changes of the construction
+    lines, one narrow row per changed line, written in bulk by the line write.
+    The contract and product are copied on the row, so that the revisions of a
+    deleted line stay reportable.
+    """
+    _name = 'construction.control.line.revision'
+    _description = 'Construction Item Estimation Revision'
+    _order = 'date desc, id desc'
+    _rec_name = 'line_id'
+    _log_access = False
+
+    line_id = fields.Many2one(
+        'construction.control.line',
+        string='Construction Item',
+        index=True,
+        ondelete='set null'
+    )
+    contract_id = fields.Many2one(
+        'construction.control',
+        string='Construction Control',
+        required=True,
+        ondelete='cascade'
+    )
+    product_id = fields.Many2one('product.product', string='Product', ondelete='set null')
+    date = fields.Datetime(string='Date', required=True, default=fields.Datetime.now)
+    user_id = fields.Many2one('res.users', string='User', ondelete='set null', default=lambda self: self.env.uid)
+    old_first_estimation_qty = fields.Float(string='Old Initial Estimation')
+    new_first_estimation_qty = fields.Float(string='New Initial Estimation')
+    old_second_estimation_qty = fields.Float(string='Old Second Estimation')
+    new_second_estimation_qty = fields.Float(string='New Second Estimation')
+    old_price = fields.Float(string='Old Unit Price')
+    new_price = fields.Float(string='New Unit Price')
+
+    def init(self):
+        create_bmis_indexes(self._cr, self._table)
+
+    @api.model
+    def _log_revisions(self, old_values, lines):
+        """Log the changes of ``lines`` against ``old_values`` {line id: {field: value}}, in one insert."""
+        vals_list = []
+        for line in lines:
+            old = old_values[line.id]
+            if all(old[fname] == line[fname] for fname in REVISION_FIELDS):
+                continue
+            vals = {
+                'line_id': line.id,
+                'contract_id': line.construction_control_id.id,
+                'product_id': line.product_id.id,
+            }
+            for fname in REVISION_FIELDS:
+                vals[f'old_{fname}'] = old[fname]
+                vals[f'new_{fname}'] = line[fname]
+            vals_list.append(vals)
+        if vals_list:
+            self.sudo().create(vals_list)
+
+    @api.model
+    def _get_changes_since(self, date, contract_ids=None):
+        """
+        Net change of every line revised since ``date``: the value before the
+        first revision and after the last one, with the number of revisions.
+        """
+        self.flush_model()
+        where, params = "date >= %s", [date]
+        if contract_ids is not None:
+            where += " AND contract_id = ANY(%s)"
+            params.append(list(contract_ids))
+        self.env.cr.execute("""
+            SELECT line_id, contract_id, product_id, COUNT(*),
+                   (ARRAY_AGG(old_first_estimation_qty ORDER BY date, id))[1],
+                   (ARRAY_AGG(new_first_estimation_qty ORDER BY date DESC, id DESC))[1],
+                   (ARRAY_AGG(old_second_estimation_qty ORDER BY date, id))[1],
+                   (ARRAY_AGG(new_second_estimation_qty ORDER BY date DESC, id DESC))[1],
+                   (ARRAY_AGG(old_price ORDER BY date, id))[1],
+                   (ARRAY_AGG(new_price ORDER BY date DESC, id DESC))[1]
+              FROM construction_control_line_revision
+             WHERE {}
+          GROUP BY line_id, contract_id, product_id
+          ORDER BY contract_id, line_id
+        """.format(where), params)
+        return [{
+            'line_id': line_id,
+            'contract_id': contract_id,
+            'product_id': product_id,
+            'revision_count': count,
+            'old_first_estimation_qty': old_first,
+            'new_first_estimation_qty': new_first,
+            'old_second_estimation_qty': old_second,
+            'new_second_estimation_qty': new_second,
+            'old_price': old_price,
+            'new_price': new_price,
+        } for line_id, contract_id, product_id, count, old_first, new_first, old_second, new_second, old_price, new_price
+            in self.env.cr.fetchall()]
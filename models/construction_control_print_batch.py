@@ -0,0 +1,217 @@
+import logging
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import models, fields, api, _
+from odoo.tools import config
+
+from .construction_control_report import CONTRACT_REPORT_NAME
+
+_logger = logging.getLogger(__name__)
+
+# Number of reports rendered in parallel, each one by its own wkhtmltopdf process.
+PRINT_WORKERS_PARAM = 'egp_bmis.print_batch_workers'
+PRINT_DEFAULT_WORKERS = 4
+# Reports handed to each worker before progress is committed.
+PRINT_CHUNK_SIZE = 5
+# Share of the cron time limit a single run may spend before it re-triggers itself,
+# and the budget in seconds when the server has no time limit.
+PRINT_TIME_BUDGET_RATIO = 0.5
+PRINT_DEFAULT_TIME_BUDGET = 60
+
+
+class ConstructionControlPrintBatch(models.Model):
+    """
+    Background printing of many construction contracts into one ZIP archive.
+    Batches are processed by a cron so that no HTTP worker is blocked.
+    """
+    _name = 'construction.control.print.batch'
+    _description = 'Construction Contract Print Batch'
+    _inherit = ['mail.thread']
+    _order = 'id desc'
+
+    name = fields.Char(
+        string='Name',
+        required=True,
+        readonly=True,
+        default=lambda self: _("Contract Reports %s", fields.Datetime.to_string(fields.Datetime.now()))
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user
+    )
+    item_ids = fields.One2many('construction.control.print.batch.item', 'batch_id', string='Contracts')
+    item_count = fields.Integer(string='Contract Count', readonly=True)
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, readonly=True, tracking=True)
+    progress = fields.Float(string='Progress', readonly=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Archive', readonly=True)
+
+    @api.model
+    def _create_for_contracts(self, contracts):
+        """Queue a print batch for ``contracts`` and wake up the print cron."""
+        batch = self.create({
+            'item_count': len(contracts),
+            'item_ids': [(0, 0, {'contract_id': contract.id}) for contract in contracts],
+        })
+        self.env.ref('egp_bmis.ir_cron_process_print_batches')._trigger()
+        return batch
+
+    def action_download(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/web/content/%s?download=true' % self.attachment_id.id,
+            'target': 'self',
+        }
+
+    def _update_progress(self):
+        counts = {
+            (batch.id, state): count
+            for batch, state, count in self.env['construction.control.print.batch.item']._read_group(
+                [('batch_id', 'in', self.ids)], ['batch_id', 'state'], ['__count'])
+        }
+        for batch in self:
+            pending = counts.get((batch.id, 'pending'), 0)
+            batch.progress = 100.0 * (batch.item_count - pending) / batch.item_count if batch.item_count else 100.0
+
+    @api.model
+    def _get_time_budget(self):
+        """Seconds a cron run may spend rendering, well under the time limit of the cron workers."""
+        limit = config['limit_time_real_cron']
+        if limit is None or limit < 0:
+            limit = config['limit_time_real']
+        return limit * PRINT_TIME_BUDGET_RATIO if limit and limit > 0 else PRINT_DEFAULT_TIME_BUDGET
+
+    @api.model
+    def _cron_process_batches(self):
+        """
+        Render pending contracts chunk by chunk, committing after each chunk,
+        then zip the batches that have nothing left to render. Every chunk
+        commits a trigger of the cron before it is rendered, so a run killed by
+        the time limit is followed by a fresh one rather than waiting for the
+        next interval.
+        """
+        Item = self.env['construction.control.print.batch.item']
+        cron = self.env.ref('egp_bmis.ir_cron_process_print_batches')
+        workers = int(self.env['ir.config_parameter'].sudo().get_param(PRINT_WORKERS_PARAM, PRINT_DEFAULT_WORKERS))
+        deadline = time.monotonic() + self._get_time_budget()
+        while time.monotonic() < deadline:
+            items = Item.search([('state', '=', 'pending')], limit=workers * PRINT_CHUNK_SIZE, order='id')
+            if not items:
+                break
+            items.batch_id.filtered(lambda b: b.state == 'queued').write({'state': 'running'})
+            cron._trigger()
+            self.env.cr.commit()
+            items._render_in_pool(workers)
+            self.env.invalidate_all()
+            items.batch_id._update_progress()
+            self.env.cr.commit()
+
+        pending_batches = Item.search([('state', '=', 'pending')]).batch_id
+        (self.search([('state', '=', 'running')]) - pending_batches)._finalize()
+
+    def _finalize(self):
+        """Zip the rendered reports of each batch and notify the requester."""
+        Attachment = self.env['ir.attachment']
+        for batch in self:
+            done_items = batch.item_ids.filtered(lambda i: i.state == 'done')
+            failed_count = len(batch.item_ids) - len(done_items)
+            with tempfile.TemporaryFile() as fileobj:
+                with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for item in done_items:
+                        archive.writestr(item._get_filename(), item.attachment_id.raw)
+                        item.attachment_id.invalidate_recordset(['raw'])
+                fileobj.seek(0)
+                attachment = Attachment.create({
+                    'name': f"{batch.name}.zip",
+                    'raw': fileobj.read(),
+                    'mimetype': 'application/zip',
+                    'res_model': batch._name,
+                    'res_id': batch.id,
+                })
+            done_items.attachment_id.unlink()
+            batch.write({
+                'attachment_id': attachment.id,
+                'state': 'done' if done_items else 'failed',
+                'progress': 100.0,
+            })
+            message = _("%(done)s contract report(s) are ready in %(name)s.", done=len(done_items), name=attachment.name)
+            if failed_count:
+                message += " " + _("%s contract(s) could not be printed.", failed_count)
+            batch.message_post(body=message, partner_ids=batch.user_id.partner_id.ids,
+                               subtype_xmlid='mail.mt_comment')
+            self.env['bus.bus']._sendone(batch.user_id.partner_id, 'simple_notification', {
+                'title': _("Contract reports ready"),
+                'message': message,
+                'sticky': True,
+            })
+            self.env.cr.commit()
+
+
+class ConstructionControlPrintBatchItem(models.Model):
+    _name = 'construction.control.print.batch.item'
+    _description = 'Construction Contract Print Batch Item'
+    _order = 'batch_id, id'
+
+    batch_id = fields.Many2one(
+        'construction.control.print.batch',
+        string='Print Batch',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+    contract_id = fields.Many2one('construction.control', string='Contract', required=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Report')
+    error = fields.Text(string='Error')
+
+    def _get_filename(self):
+        name = self.contract_id.contract_number or f"Contract-{self.contract_id.id}"
+        return "%s.pdf" % name.replace('/', '-')
+
+    def _render_in_pool(self, workers):
+        """
+        Render the reports of ``self`` in a thread pool. Every thread works with
+        its own cursor, as the requesting user, and drives its own wkhtmltopdf
+        process, so the conversions run in parallel processes.
+        """
+        registry, context = self.env.registry, dict(self.env.context)
+        jobs = [(item.id, item.contract_id.id, item.batch_id.user_id.id) for item in self]
+
+        def render(job):
+            item_id, contract_id, uid = job
+            with registry.cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                item = env['construction.control.print.batch.item'].sudo().browse(item_id)
+                try:
+                    with cr.savepoint():
+                        pdf, _report_type = env['ir.actions.report']._render_qweb_pdf(
+                            CONTRACT_REPORT_NAME, [contract_id])
+                        attachment = env['ir.attachment'].sudo().create({
+                            'name': item._get_filename(),
+                            'raw': pdf,
+                            'mimetype': 'application/pdf',
+                            'res_model': item._name,
+                            'res_id': item.id,
+                        })
+                        item.write({'state': 'done', 'attachment_id': attachment.id})
+                except Exception as e:
+                    _logger.exception("Printing construction contract %s failed", contract_id)
+                    item.write({'state': 'failed', 'error': str(e)})
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            list(pool.map(render, jobs))
@@ -0,0 +1,199 @@
+from odoo import models, api, _
+from odoo.tools.pdf import merge_pdf
+from collections import defaultdict
+
+from .bmis_perf_log import bmis_instrumented
+
+CONTRACT_REPORT_NAME = 'egp_bmis.report_construction_control'
+
+# Contracts with more lines than this are rendered in separate chunks then merged.
+REPORT_LINE_CHUNK_SIZE = 1000
+
+# Number of lines read per query by the spreadsheet export.
+EXPORT_BATCH_SIZE = 2000
+
+REPORT_LINE_FIELDS = [
+    'construction_control_id', 'product_id', 'description', 'unit_measure', 'max_qty',
+    'first_estimation_qty', 'second_estimation_qty', 'estimation_difference',
+    'price', 'sub_total', 'completed', 'details',
+]
+
+
+class ReportConstructionControl(models.AbstractModel):
+    """
+    Contract level construction report. Lines are read in bulk, grouped by
+    product category (or product) and all totals are aggregated up front, so
+    the template only has to print prepared values.
+    """
+    _name = 'report.egp_bmis.report_construction_control'
+    _description = 'Construction Control Contract Report'
+
+    @api.model
+    def _get_group_labels(self, product_ids, group_by):
+        """Map product id -> label of the report group it belongs to."""
+        products = self.env['product.product'].browse(product_ids)
+        if group_by == 'product':
+            return {product.id: product.display_name for product in products}
+        return {product.id: product.categ_id.display_name or _("Uncategorized") for product in products}
+
+    @api.model
+    def _get_ordered_line_ids(self, contract_ids, group_by):
+        """
+        Map contract id -> ids of its lines in report order: by group label,
+        then by id. The lines of a group are contiguous, but a large group may
+        still be split across two chunks, each one rendering its own header.
+        """
+        line_index = self.env['construction.control.line'].with_context(active_test=False).search_read(
+            [('construction_control_id', 'in', contract_ids)], ['construction_control_id', 'product_id'], order='id')
+        labels = self._get_group_labels(
+            list({line['product_id'][0] for line in line_index if line['product_id']}), group_by)
+        ordered_ids = defaultdict(list)
+        for line in sorted(line_index, key=lambda l: (labels.get(l['product_id'] and l['product_id'][0], ''), l['id'])):
+            ordered_ids[line['construction_control_id'][0]].append(line['id'])
+        return ordered_ids
+
+    @api.model
+    @bmis_instrumented
+    def _get_report_values(self, docids, data=None):
+        """
+        ``data`` may hold the ``line_ids`` of the chunk of one contract to
+        render, in report order, and the ``line_offset`` of that chunk.
+        """
+        data = data or {}
+        group_by = data.get('group_by', 'category')
+        offset = data.get('line_offset', 0)
+        docs = self.env['construction.control'].browse(docids)
+        Line = self.env['construction.control.line'].with_context(active_test=False)
+
+        # totals over the whole contracts, whatever chunk is being rendered
+        product_totals = Line._read_group(
+            [('construction_control_id', 'in', docs.ids)],
+            groupby=['construction_control_id', 'product_id'],
+            aggregates=['sub_total:sum', '__count'],
+        )
+        labels = self._get_group_labels(list({product.id for _c, product, _t, _n in product_totals}), group_by)
+        contracts = {doc.id: {
+            'groups': [],
+            'group_totals': defaultdict(float),
+            'total': 0.0,
+            'line_count': 0,
+            'details': [],
+        } for doc in docs}
+        for contract, product, total, count in product_totals:
+            values = contracts[contract.id]
+            values['group_totals'][labels.get(product.id, _("Uncategorized"))] += total or 0.0
+            values['total'] += total or 0.0
+            values['line_count'] += count
+
+        if data.get('line_ids') is not None:
+            selected_ids = data['line_ids']
+        else:
+            ordered_ids = self._get_ordered_line_ids(docs.ids, group_by)
+            selected_ids = [line_id for doc in docs for line_id in ordered_ids[doc.id]]
+        for doc in docs:
+            contracts[doc.id]['is_first_chunk'] = not offset
+            contracts[doc.id]['is_last_chunk'] = offset + len(selected_ids) >= contracts[doc.id]['line_count']
+
+        groups = {}
+        counters = defaultdict(lambda: offset)
+        for line in Line.browse(selected_ids).read(REPORT_LINE_FIELDS):
+            contract_id = line['construction_control_id'][0]
+            values = contracts[contract_id]
+            product_name = line['product_id'][1] if line['product_id'] else ''
+            label = labels.get(line['product_id'][0], _("Uncategorized")) if line['product_id'] else _("Uncategorized")
+            group = groups.get((contract_id, label))
+            if group is None:
+                group = groups[(contract_id, label)] = {
+                    'name': label,
+                    'total': values['group_totals'][label],
+                    'lines': [],
+                }
+                values['groups'].append(group)
+            counters[contract_id] += 1
+            group['lines'].append(dict(
+                line,
+                index=counters[contract_id],
+                product=product_name,
+                unit=line['unit_measure'][1] if line['unit_measure'] else '',
+            ))
+            if line['details']:
+                values['details'].append((product_name, line['details']))
+
+        return {
+            'doc_ids': docs.ids,
+            'doc_model': 'construction.control',
+            'docs': docs,
+            'contracts': contracts,
+            'group_by': group_by,
+        }
+
+    @api.model
+    def _get_export_header(self):
+        return [
+            _("Contract Number"), _("Product"), _("Description"), _("Unit"), _("Max Qty"),
+            _("Initial Estimation"), _("Second Estimation"), _("Estimation Difference"),
+            _("Unit Price"), _("Subtotal"), _("Completed"),
+        ]
+
+    @api.model
+    def _iter_export_rows(self, contract_ids):
+        """
+        Yield the lines of ``contract_ids`` as export rows. Lines are read in
+        id ordered batches and the cache is dropped between batches, so memory
+        stays flat whatever the size of the bill of quantities.
+        """
+        Line = self.env['construction.control.line'].with_context(active_test=False)
+        last_id = 0
+        while True:
+            lines = Line.search_read(
+                [('construction_control_id', 'in', contract_ids), ('id', '>', last_id)],
+                REPORT_LINE_FIELDS, order='id', limit=EXPORT_BATCH_SIZE)
+            if not lines:
+                return
+            for line in lines:
+                yield [
+                    line['construction_control_id'][1] or '',
+                    line['product_id'][1] if line['product_id'] else '',
+                    line['description'] or '',
+                    line['unit_measure'][1] if line['unit_measure'] else '',
+                    line['max_qty'],
+                    line['first_estimation_qty'],
+                    line['second_estimation_qty'],
+                    line['estimation_difference'],
+                    line['price'],
+                    line['sub_total'],
+                    line['completed'],
+                ]
+            last_id = lines[-1]['id']
+            self.env.invalidate_all()
+
+
+class IrActionsReport(models.Model):
+    _inherit = 'ir.actions.report'
+
+    def _render_qweb_pdf(self, report_ref, res_ids=None, data=None):
+        """Render large construction contracts chunk by chunk and merge the PDFs."""
+        report = self._get_report(report_ref)
+        if report.report_name != CONTRACT_REPORT_NAME or not res_ids or (data or {}).get('line_ids') is not None:
+            return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        line_counts = {
+            contract.id: count
+            for contract, count in self.env['construction.control.line'].with_context(active_test=False)._read_group(
+                [('construction_control_id', 'in', res_ids)], ['construction_control_id'], ['__count'])
+        }
+        if max(line_counts.values(), default=0) <= REPORT_LINE_CHUNK_SIZE:
+            return super()._render_qweb_pdf(report_ref, res_ids=res_ids, data=data)
+
+        # the line order is read once, each chunk then only reads its own lines
+        ordered_ids = self.env[f'report.{CONTRACT_REPORT_NAME}']._get_ordered_line_ids(
+            res_ids, (data or {}).get('group_by', 'category'))
+        pdfs = []
+        for contract_id in res_ids:
+            line_ids = ordered_ids[contract_id]
+            for offset in range(0, max(len(line_ids), 1), REPORT_LINE_CHUNK_SIZE):
+                chunk_data = dict(data or {}, line_offset=offset,
+                                  line_ids=line_ids[offset:offset + REPORT_LINE_CHUNK_SIZE])
+                pdf, _report_type = super()._render_qweb_pdf(report_ref, res_ids=[contract_id], data=chunk_data)
+                pdfs.append(pdf)
+        return merge_pdf(pdfs), 'pdf'
@@ -0,0 +1,110 @@
+from odoo import models, fields, api
+from datetime import timedelta
+
+SNAPSHOT_LAST_RUN_PARAM = 'egp_bmis.snapshot_last_run'
+
+
+class ConstructionControlSnapshot(models.Model):
+    """
+    One row per contract and day with the planned, delivered and approved
+    values of the contract, feeding the progress curves and trend dashboards.
+    """
+    _name = 'construction.control.snapshot'
+    _description = 'Construction Contract Daily Progress'
+    _order = 'date desc, contract_id'
+
+    contract_id = fields.Many2one(
+        'construction.control',
+        string='Construction Control',
+        required=True,
+        index=True,
+        ondelete='cascade'
+    )
+    date = fields.Date(string='Date', required=True, index=True)
+    planned_value = fields.Float(string='Planned Value', help='Sum of the line subtotals.')
+    delivered_value = fields.Float(string='Delivered Value', help='Delivered quantity × unit price.')
+    approved_value = fields.Float(string='Approved Value', help='Approved QC quantity × unit price.')
+
+    _sql_constraints = [
+        ('contract_date_uniq', 'unique(contract_id, date)', 'Only one snapshot is allowed per contract and day.'),
+    ]
+
+    @api.model
+    def _cron_take_snapshots(self):
+        """
+        Carry the previous snapshot forward for the days since the last run with
+        a single insert, then recompute today's row of the contracts changed
+        since the last run only.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        started_at = fields.Datetime.now()
+        today = fields.Date.context_today(self)
+        last_run = ICP.get_param(SNAPSHOT_LAST_RUN_PARAM)
+
+        self.flush_model()
+        self.env.cr.execute("SELECT MAX(date) FROM construction_control_snapshot")
+        last_date = self.env.cr.fetchone()[0]
+        if last_date and last_date < today:
+            self.env.cr.execute("""
+                INSERT INTO construction_control_snapshot
+                       (contract_id, date, planned_value, delivered_value, approved_value,
+                        create_uid, create_date, write_uid, write_date)
+                SELECT s.contract_id, d.day::date, s.planned_value, s.delivered_value, s.approved_value,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM construction_control_snapshot s
+            CROSS JOIN generate_series(%(start)s::date, %(today)s::date, interval '1 day') AS d(day)
+                 WHERE s.date = %(last_date)s
+           ON CONFLICT (contract_id, date) DO NOTHING
+            """, {
+                'uid': self.env.uid,
+                'start': last_date + timedelta(days=1),
+                'today': today,
+                'last_date': last_date,
+            })
+            self.invalidate_model()
+
+        self._take_snapshot(self._get_changed_contracts(last_run), today)
+        ICP.set_param(SNAPSHOT_LAST_RUN_PARAM, fields.Datetime.to_string(started_at))
+
+    @api.model
+    def _get_changed_contracts(self, since):
+        """Contracts whose lines, deliveries or approvals changed since ``since``."""
+        Contract = self.env['construction.control']
+        if not since:
+            return Contract.search([])
+        contracts = Contract.search([('write_date', '>=', since)])
+        contracts |= Contract.browse(
+            contract.id for [contract] in self.env['construction.control.line']._read_group(
+                [('write_date', '>=', since)], ['construction_control_id']))
+        contracts |= Contract.browse(
+            contract.id for [contract] in self.env['construction.control.ledger']._read_group(
+                [('write_date', '>=', since)], ['contract_id']))
+        contracts |= self.env['construction.control.line'].browse(
+            line.id for [line] in self.env['construction.control.line.part']._read_group(
+                [('write_date', '>=', since)], ['line_id'])).construction_control_id
+        return contracts
+
+    @api.model
+    def _compute_snapshot_values(self, contracts):
+        """Current planned, delivered and approved values of ``contracts``, from their stored rollups."""
+        return {contract['id']: {
+            'planned_value': contract['estimated_value'],
+            'delivered_value': contract['delivered_value'],
+            'approved_value': contract['approved_value'],
+        } for contract in contracts.with_context(active_test=False).read(
+            ['estimated_value', 'delivered_value', 'approved_value'])}
+
+    @api.model
+    def _take_snapshot(self, contracts, date):
+        """Create or update the ``date`` snapshot of ``contracts``."""
+        if not contracts:
+            return
+        values = self._compute_snapshot_values(contracts)
+        for snapshot in self.search([('contract_id', 'in', contracts.ids), ('date', '=', date)]):
+            vals = values.pop(snapshot.contract_id.id)
+            if any(snapshot[fname] != value for fname, value in vals.items()):
+                snapshot.write(vals)
+        self.create([
+            dict(vals, contract_id=contract_id, date=date)
+            for contract_id, vals in values.items()
+        ])
@@ -0,0 +1,125 @@
+from odoo import models, fields, api
+
+# Oldest transaction start seen by the last refresh: rows written since then are refreshed.
+VALUE_REPORT_WATERMARK_PARAM = 'egp_bmis.value_report_watermark'
+
+VALUE_REPORT_COLUMNS = [
+    ('contract_id', 'int4'),
+    ('active', 'bool'),
+    ('state', 'varchar'),
+    ('warehouse_id', 'int4'),
+    ('project_manager_id', 'int4'),
+    ('product_id', 'int4'),
+    ('estimated_qty', 'float8'),
+    ('estimated_value', 'float8'),
+    ('approved_qty', 'float8'),
+    ('approved_value', 'float8'),
+    ('delivered_qty', 'float8'),
+    ('delivered_value', 'float8'),
+    ('received_qty', 'float8'),
+    ('received_value', 'float8'),
+]
+
+
+class ConstructionControlValueReport(models.Model):
+    """
+    Portfolio analysis of estimated, approved, delivered and received values,
+    one row per construction line. Backed by a summary table that a cron
+    refreshes incrementally, so that pivots over all contracts never touch the ORM.
+    """
+    _name = 'construction.control.value.report'
+    _description = 'Construction Value Analysis'
+    _auto = False
+    _order = 'contract_id, product_id'
+
+    contract_id = fields.Many2one('construction.control', string='Construction Control', readonly=True)
+    active = fields.Boolean(string='Active', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('in_progress', 'In Progress'),
+        ('done', 'Done'),
+    ], string='Status', readonly=True)
+    warehouse_id = fields.Many2one('stock.warehouse', string='Warehouse', readonly=True)
+    project_manager_id = fields.Many2one('hr.employee', string='Project Manager', readonly=True)
+    product_id = fields.Many2one('product.product', string='Product', readonly=True)
+    estimated_qty = fields.Float(string='Estimated Qty', readonly=True)
+    estimated_value = fields.Float(string='Estimated Value', readonly=True)
+    approved_qty = fields.Float(string='QC Approved Qty', readonly=True)
+    approved_value = fields.Float(string='QC Approved Value', readonly=True)
+    delivered_qty = fields.Float(string='Delivered Qty', readonly=True)
+    delivered_value = fields.Float(string='Delivered Value', readonly=True)
+    received_qty = fields.Float(string='Property Received Qty', readonly=True)
+    received_value = fields.Float(string='Property Received Value', readonly=True)
+
+    def _query(self):
+        return """
+            SELECT l.id AS id,
+                   l.construction_control_id AS contract_id,
+                   c.active AS active,
+                   c.state AS state,
+                   c.warehouse_id AS warehouse_id,
+                   c."Project_manager" AS project_manager_id,
+                   l.product_id AS product_id,
+                   COALESCE(l.first_estimation_qty, 0) AS estimated_qty,
+                   COALESCE(l.sub_total, 0) AS estimated_value,
+                   COALESCE(l.qc_approved_qty, 0) AS approved_qty,
+                   COALESCE(l.qc_approved_value, 0) AS approved_value,
+                   COALESCE(l.delivered_qty, 0) AS delivered_qty,
+                   COALESCE(l.delivered_value, 0) AS delivered_value,
+                   COALESCE(l.pc_received_qty, 0) AS received_qty,
+                   COALESCE(l.pc_received_qty, 0) * COALESCE(l.price, 0) AS received_value
+              FROM construction_control_line l
+              JOIN construction_control c ON c.id = l.construction_control_id
+        """
+
+    def init(self):
+        cr = self.env.cr
+        cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", [self._table])
+        relkind = (cr.fetchone() or [None])[0]
+        if relkind == 'r':
+            return
+        if relkind == 'm':
+            # the analysis used to be a materialized view
+            cr.execute("DROP MATERIALIZED VIEW %s" % self._table)
+        cr.execute("CREATE TABLE %s (id int4 PRIMARY KEY, %s)" % (
+            self._table, ', '.join('%s %s' % column for column in VALUE_REPORT_COLUMNS)))
+        # filled entirely by the next refresh
+        self.env['ir.config_parameter'].sudo().set_param(VALUE_REPORT_WATERMARK_PARAM, False)
+
+    @api.model
+    def _cron_refresh(self):
+        """
+        Upsert the rows of the lines written, or whose contract was written,
+        since the last refresh, then drop the rows of the deleted lines.
+        Stored computes also bump the write date, so the changed rows are all
+        caught. The next watermark is the start of the oldest running
+        transaction, whose writes may still be uncommitted.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        cr = self.env.cr
+        self.env['construction.control'].flush_model()
+        self.env['construction.control.line'].flush_model()
+        cr.execute("""
+            SELECT MIN(xact_start) AT TIME ZONE 'UTC' FROM pg_stat_activity
+             WHERE datname = current_database() AND xact_start IS NOT NULL
+        """)
+        watermark = cr.fetchone()[0]
+        since = ICP.get_param(VALUE_REPORT_WATERMARK_PARAM) or '1970-01-01 00:00:00'
+        columns = ['id'] + [name for name, _type in VALUE_REPORT_COLUMNS]
+        cr.execute("""
+            INSERT INTO {table} ({columns})
+            {query}
+             WHERE l.write_date >= %(since)s OR c.write_date >= %(since)s
+            ON CONFLICT (id) DO UPDATE SET {updates}
+        """.format(
+            table=self._table,
+            columns=', '.join(columns),
+            query=self._query(),
+            updates=', '.join('%s = EXCLUDED.%s' % (name, name) for name in columns[1:]),
+        ), {'since': since})
+        cr.execute("""
+            DELETE FROM {table} r
+             WHERE NOT EXISTS (SELECT 1 FROM construction_control_line l WHERE l.id = r.id)
+        """.format(table=self._table))
+        self.invalidate_model()
+        ICP.set_param(VALUE_REPORT_WATERMARK_PARAM, fields.Datetime.to_string(watermark))
@@ -1,6 +1,41 @@
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _, _lt
 from odoo.exceptions import UserError, ValidationError
+from odoo.osv import expression
+from odoo.tools import split_every
 from collections import defaultdict
+from datetime import timedelta
+
+from .bmis_indexes import CONTRACT_OPEN_STATES, create_bmis_indexes
+from .bmis_perf_log import bmis_instrumented
+from .construction_control_line_revision import REVISION_FIELDS
+
+# Number of QC/PC records created per ``create`` call when dispatching a selection.
+QC_DISPATCH_BATCH_SIZE = 100
+
+# construction.control field -> proc.contract field, copied by the onchange and the contract sync
+PROC_CONTRACT_SYNC_FIELDS = {
+    'contract_number': 'contract_number',
+    'contract_date': 'contract_date',
+    'start_date': 'start_date',
+    'contract_end_date': 'contract_end_date',
+    'Project_manager': 'project_manager',
+}
+PROC_CONTRACT_SYNC_PARAM = 'egp_bmis.proc_contract_sync_date'
+PROC_CONTRACT_SYNC_BATCH_SIZE = 500
+
+# Deadline monitoring: contracts ending within the warning period get an activity for their project manager.
+DEADLINE_WARNING_DAYS_PARAM = 'egp_bmis.deadline_warning_days'
+DEADLINE_DEFAULT_WARNING_DAYS = 14
+# id of the last contract processed, so that an interrupted run resumes where it stopped
+DEADLINE_CURSOR_PARAM = 'egp_bmis.deadline_cron_cursor'
+DEADLINE_CHUNK_SIZE = 200
+
+# summary kind -> (ledger source, label of the count column)
+SUMMARY_KINDS = {
+    'qc': ('qc', _lt("QC Count")),
+    'pc': ('pc', _lt("PC Count")),
+    'property': ('pc', _lt("Property Count")),
+}
 
 
 class ConstructionControl(models.Model):
@@ -55,9 +90,13 @@ class ConstructionControl(models.Model):
         'construction.control.line',
         'construction_control_id',
         string='Construction Items',
+        context={'active_test': False},
         help='List of items being tracked for construction quality.'
     )
 
+    # archived with their contract once it is done, see write()
+    active = fields.Boolean(string='Active', default=True)
+
     state = fields.Selection([
         ('draft', 'Draft'),
         ('in_progress', 'In Progress'),
@@ -84,12 +123,36 @@ class ConstructionControl(models.Model):
         store=False
     )
 
-    @api.depends()
+    def init(self):
+        create_bmis_indexes(self._cr, self._table)
+
+    @api.model
+    def _name_search(self, name, domain=None, operator='ilike', limit=None, order=None):
+        """
+        Contract numbers starting with ``name`` come first, then the ones
+        containing it, then the contracts whose procurement contract matches.
+        Each step only runs when the previous ones did not fill ``limit``.
+        """
+        if not name or operator != 'ilike' or not limit:
+            return super()._name_search(name, domain, operator, limit=limit, order=order)
+        domain = domain or []
+        prefix = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        ids = []
+        for step in (
+            [('contract_number', '=ilike', prefix)],
+            [('contract_number', 'ilike', name)],
+            [('contract_id', 'ilike', name)],
+        ):
+            ids += self._search(
+                expression.AND([domain, step, [('id', 'not in', ids)]]), limit=limit - len(ids), order=order)
+            if len(ids) >= limit:
+                break
+        return ids
+
+    @api.depends_context('uid')
     def _compute_user_has_group_bmis_officer(self):
-        """Check if current user is in the BMIS officer group."""
-        group = self.env.ref('egp_bmis.group_bmis_officer', raise_if_not_found=False)
-        for record in self:
-            record.user_has_group_bmis_officer = group in self.env.user.groups_id if group else False
+        """Check if current user is in the BMIS officer group, once for all the records."""
+        self.user_has_group_bmis_officer = self.env.user.has_group('egp_bmis.group_bmis_officer')
 
     # for the construction control status btn to see the contract of egp_procurement
     def action_view_procurement_contract(self):
@@ -117,19 +180,158 @@ class ConstructionControl(models.Model):
     @api.onchange('contract_id')
     def _onchange_contract_id_fill(self):
         if self.contract_id:
-            self.contract_number = self.contract_id.contract_number
-            self.contract_date = self.contract_id.contract_date
-            self.start_date = self.contract_id.start_date
-            self.contract_end_date = self.contract_id.contract_end_date
-            self.Project_manager = self.contract_id.project_manager
+            for field_name, source_name in PROC_CONTRACT_SYNC_FIELDS.items():
+                self[field_name] = self.contract_id[source_name]
+
+    def _sync_from_proc_contract(self):
+        """
+        Copy the procurement contract metadata onto ``self``. Only the fields
+        that differ are written, with one ``write`` per distinct set of values.
+        Returns the number of updated records.
+        """
+        target_fields = list(PROC_CONTRACT_SYNC_FIELDS)
+        targets = self.read(['contract_id'] + target_fields, load=None)
+        proc_contracts = self.env['proc.contract'].browse({t['contract_id'] for t in targets if t['contract_id']})
+        sources = {
+            source['id']: source
+            for source in proc_contracts.read(list(PROC_CONTRACT_SYNC_FIELDS.values()), load=None)
+        }
+        updates = defaultdict(list)
+        for target in targets:
+            source = sources.get(target['contract_id'])
+            if not source:
+                continue
+            diff = tuple(
+                (field_name, source[source_name])
+                for field_name, source_name in PROC_CONTRACT_SYNC_FIELDS.items()
+                if source[source_name] != target[field_name]
+            )
+            if diff:
+                updates[diff].append(target['id'])
+        for diff, ids in updates.items():
+            self.browse(ids).write(dict(diff))
+        return sum(len(ids) for ids in updates.values())
+
+    @bmis_instrumented
+    def action_sync_from_proc_contract(self):
+        count = self._sync_from_proc_contract()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'message': _("%s contract(s) updated from procurement.", count),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    @api.model
+    def _cron_sync_proc_contracts(self):
+        """Sync the records whose procurement contract changed since the last run."""
+        ICP = self.env['ir.config_parameter'].sudo()
+        started_at = fields.Datetime.now()
+        domain = [('contract_id', '!=', False)]
+        last_sync = ICP.get_param(PROC_CONTRACT_SYNC_PARAM)
+        if last_sync:
+            domain.append(('contract_id.write_date', '>=', last_sync))
+        for ids in split_every(PROC_CONTRACT_SYNC_BATCH_SIZE, self.search(domain).ids):
+            self.browse(ids)._sync_from_proc_contract()
+            self.env.invalidate_all()
+        ICP.set_param(PROC_CONTRACT_SYNC_PARAM, fields.Datetime.to_string(started_at))
+
+    @api.model
+    def _get_deadline_domain(self):
+        """
+        Open contracts ending within the warning period with quantities left.
+        The open states are listed so that the open end date index applies.
+        """
+        warning_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            DEADLINE_WARNING_DAYS_PARAM, DEADLINE_DEFAULT_WARNING_DAYS))
+        return [
+            ('state', 'in', CONTRACT_OPEN_STATES),
+            ('contract_end_date', '<=', fields.Date.context_today(self) + timedelta(days=warning_days)),
+            ('Project_manager.user_id', '!=', False),
+            ('line_ids.remaining_qty', '>', 0),
+        ]
+
+    @api.model
+    def _cron_check_deadlines(self):
+        """
+        Schedule the deadline activities chunk by chunk, committing after each
+        chunk. The last processed id is saved so that a run interrupted by the
+        cron timeout resumes from there instead of starting over.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        domain = self._get_deadline_domain()
+        cursor = int(ICP.get_param(DEADLINE_CURSOR_PARAM, 0))
+        while True:
+            contracts = self.search(domain + [('id', '>', cursor)], order='id', limit=DEADLINE_CHUNK_SIZE)
+            if not contracts:
+                ICP.set_param(DEADLINE_CURSOR_PARAM, 0)
+                break
+            contracts._schedule_deadline_activities()
+            cursor = contracts[-1].id
+            ICP.set_param(DEADLINE_CURSOR_PARAM, cursor)
+            self.env.cr.commit()
+            self.env.invalidate_all()
+
+    def _schedule_deadline_activities(self):
+        """
+        Create the missing deadline activities of the contracts in one go and
+        move the existing ones whose contract end date changed.
+        """
+        activity_type = self.env.ref('egp_bmis.mail_activity_type_contract_deadline')
+        Activity = self.env['mail.activity'].with_context(mail_activity_quick_update=True)
+        existing = Activity.search([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+            ('activity_type_id', '=', activity_type.id),
+        ])
+        by_contract = {activity.res_id: activity for activity in existing}
+
+        moved = defaultdict(lambda: Activity.browse())
+        vals_list = []
+        model_id = self.env['ir.model']._get_id(self._name)
+        for contract in self:
+            activity = by_contract.get(contract.id)
+            if activity:
+                if activity.date_deadline != contract.contract_end_date:
+                    moved[contract.contract_end_date] |= activity
+                continue
+            vals_list.append({
+                'res_model_id': model_id,
+                'res_id': contract.id,
+                'activity_type_id': activity_type.id,
+                'user_id': contract.Project_manager.user_id.id,
+                'date_deadline': contract.contract_end_date,
+                'summary': _("Contract %s ends on %s with quantities still to deliver",
+                             contract.contract_number or contract.id, contract.contract_end_date),
+            })
+        for date_deadline, activities in moved.items():
+            activities.write({'date_deadline': date_deadline})
+        Activity.create(vals_list)
+
+    def _check_selection(self, domain, message):
+        """Raise ``message`` listing the records of the selection matching ``domain``, found with one query."""
+        offending = self.with_context(active_test=False).search([('id', 'in', self.ids)] + domain)
+        if offending:
+            raise ValidationError(self._dispatch_error_message(message, offending))
+
+    def write(self, vals):
+        if 'active' in vals and not vals['active']:
+            self._check_selection([('state', '!=', 'done')], _("Only done contracts can be archived."))
+        res = super().write(vals)
+        if 'active' in vals:
+            # lines are archived and restored with their contract
+            self.env['construction.control.line'].with_context(active_test=False).search([
+                ('construction_control_id', 'in', self.ids),
+                ('active', '!=', bool(vals['active'])),
+            ]).write({'active': bool(vals['active'])})
+        return res
 
     def unlink(self):
-        for rec in self:
-            if rec.state == 'done':
-                raise ValidationError(_("You cannot delete the record that has been done."))
-            else:
-                return super(ConstructionControl, self).unlink()
-        return None
+        self._check_selection([('state', '=', 'done')], _("You cannot delete the record that has been done."))
+        return super(ConstructionControl, self).unlink()
 
         # In `proc.contract` model inventory connection
     quality_ids = fields.One2many(
@@ -145,28 +347,124 @@ class ConstructionControl(models.Model):
         'property.control', 'const_contract_id', string="Equipments"
     )
 
-    pc_count = fields.Integer(
-        string="PC Count",
-        compute="_compute_pc_count",
-        store=True  # optional, if you want it stored
+    # Per-state counters of the QC/PC records, computed for the whole page with one grouped query.
+    # Computed as superuser: project managers and warehouse users see the counters of their
+    # contracts without read access to the QC/PC records themselves.
+    pc_count = fields.Integer(string="PC Count", compute="_compute_control_counts", compute_sudo=True)
+    pc_draft_count = fields.Integer(string="PC Draft", compute="_compute_control_counts", compute_sudo=True)
+    pc_in_progress_count = fields.Integer(string="PC In Progress", compute="_compute_control_counts", compute_sudo=True)
+    pc_done_count = fields.Integer(string="PC Done", compute="_compute_control_counts", compute_sudo=True)
+    qc_count = fields.Integer(string="QC Count", compute="_compute_control_counts", compute_sudo=True)
+    qc_draft_count = fields.Integer(string="QC Draft", compute="_compute_control_counts", compute_sudo=True)
+    qc_in_progress_count = fields.Integer(string="QC In Progress", compute="_compute_control_counts", compute_sudo=True)
+    qc_done_count = fields.Integer(string="QC Done", compute="_compute_control_counts", compute_sudo=True)
+
+    # Financial rollups, stored and kept up to date from the stored values of the lines.
+    estimated_value = fields.Float(
+        string="Estimated Value",
+        compute="_compute_contract_values",
+        store=True,
+        help="Sum of the line subtotals."
+    )
+    approved_value = fields.Float(
+        string="Approved Value",
+        compute="_compute_contract_values",
+        store=True,
+        help="Value of the quantities approved by Quality Control."
+    )
+    delivered_value = fields.Float(
+        string="Delivered Value",
+        compute="_compute_contract_values",
+        store=True,
+        help="Value of the partial deliveries."
+    )
+    variance_value = fields.Float(
+        string="Estimation Variance Value",
+        compute="_compute_contract_values",
+        store=True,
+        help="Value of the difference between the initial and second estimations."
     )
 
-    @api.depends('property_control_ids')
-    def _compute_pc_count(self):
-        for rec in self:
-            rec.pc_count = len(rec.property_control_ids)
-
-    qc_count = fields.Integer(
-        string="QC Count",
-        compute="_compute_qc_count",
-        store=True  # optional, if you want it stored
+    is_overdue = fields.Boolean(
+        string="Overdue",
+        compute="_compute_is_overdue",
+        search="_search_is_overdue"
     )
 
-    @api.depends('construction_quality_ids')
-    def _compute_qc_count(self):
+    def _get_control_state_counts(self, model):
+        """Map (contract id, draft/in_progress/done) -> number of ``model`` records."""
+        counts = defaultdict(int)
+        for contract, state, count in self.env[model]._read_group(
+                [('const_contract_id', 'in', self.ids)], ['const_contract_id', 'state'], ['__count']):
+            bucket = state if state in ('draft', 'done') else 'in_progress'
+            counts[(contract.id, bucket)] += count
+        return counts
+
+    @api.depends('property_control_ids.state', 'construction_quality_ids.state')
+    @bmis_instrumented
+    def _compute_control_counts(self):
+        for prefix, model in (('qc', 'quality.control'), ('pc', 'property.control')):
+            counts = self._get_control_state_counts(model)
+            for rec in self:
+                total = 0
+                for state in ('draft', 'in_progress', 'done'):
+                    count = counts[(rec.id, state)]
+                    rec[f'{prefix}_{state}_count'] = count
+                    total += count
+                rec[f'{prefix}_count'] = total
+
+    @api.depends('line_ids.sub_total', 'line_ids.qc_approved_value',
+                 'line_ids.delivered_value', 'line_ids.variance_value')
+    @bmis_instrumented
+    def _compute_contract_values(self):
+        """
+        Saved contracts are summed with one grouped query over their lines;
+        contracts being edited in a form are summed from their lines in memory.
+        """
+        totals = {
+            contract.id: (estimated, approved, delivered, variance)
+            for contract, estimated, approved, delivered, variance
+            in self.env['construction.control.line'].with_context(active_test=False)._read_group(
+                [('construction_control_id', 'in', [rec.id for rec in self if rec.id])],
+                ['construction_control_id'],
+                ['sub_total:sum', 'qc_approved_value:sum', 'delivered_value:sum', 'variance_value:sum'])
+        }
         for rec in self:
-            rec.qc_count = len(rec.construction_quality_ids)
+            if rec.id:
+                values = totals.get(rec.id, (0.0, 0.0, 0.0, 0.0))
+            else:
+                lines = rec.line_ids
+                values = (sum(lines.mapped('sub_total')), sum(lines.mapped('qc_approved_value')),
+                          sum(lines.mapped('delivered_value')), sum(lines.mapped('variance_value')))
+            rec.estimated_value, rec.approved_value, rec.delivered_value, rec.variance_value = values
+
+    @api.depends('contract_end_date', 'state')
+    def _compute_is_overdue(self):
+        today = fields.Date.context_today(self)
+        for rec in self:
+            rec.is_overdue = (bool(rec.contract_end_date) and rec.contract_end_date < today
+                              and rec.state in CONTRACT_OPEN_STATES)
 
+    def _search_is_overdue(self, operator, value):
+        """
+        Both branches are stated explicitly, as the compute evaluates them: a
+        negated domain would drop the open contracts without an end date. The
+        overdue branch matches the open end date index.
+        """
+        if operator not in ('=', '!=') or not isinstance(value, bool):
+            raise UserError(_("Operation not supported"))
+        today = fields.Date.context_today(self)
+        if (operator == '=') == value:
+            return [
+                ('state', 'in', CONTRACT_OPEN_STATES),
+                ('contract_end_date', '<', today),
+            ]
+        return [
+            '|', '|',
+            ('contract_end_date', '=', False),
+            ('contract_end_date', '>=', today),
+            ('state', 'not in', CONTRACT_OPEN_STATES),
+        ]
 
     # @api.model
     # def action_send_to_property(self):
@@ -175,87 +473,127 @@ class ConstructionControl(models.Model):
     #     self.write({'state': 'draft'})
     #     return True
 
+    def _dispatch_error_message(self, message, contracts):
+        """Append the offending contract numbers when dispatching a multi-record selection."""
+        if len(self) > 1:
+            message = "%s\n%s" % (message, ", ".join(
+                c.contract_number or f"Contract-{c.id}" for c in contracts))
+        return message
+
+    def _check_dispatch_ready(self, active_records, active_message):
+        """
+        Validate the whole selection before dispatching it to inventory.
+        ``active_records`` are the QC/PC records still open for the selection.
+        """
+        missing_warehouse = self.filtered(lambda c: not c.warehouse_id)
+        if missing_warehouse:
+            raise ValidationError(self._dispatch_error_message(
+                "Missing Warehouse on contract.", missing_warehouse))
+        missing_vendor = self.filtered(lambda c: not c.contract_id or not c.contract_id.proc_offer_id)
+        if missing_vendor:
+            raise ValidationError(self._dispatch_error_message(
+                "Missing Vendor in the contract offer.", missing_vendor))
+        blocked = active_records.const_contract_id
+        if blocked:
+            raise UserError(self._dispatch_error_message(active_message, blocked))
+
+    def _dispatch_summary(self, title, records):
+        """Single summary of a dispatch for the user, listing the references created."""
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': title,
+                'message': ", ".join(records.mapped('name')),
+                'type': 'success',
+                'sticky': False,
+            },
+        }
+
+    @bmis_instrumented
     def action_send_to_quality_control(self):
+        """
+        Create one QC per contract for the quantities not yet approved.
+        The whole selection is validated up front, the remaining quantities are
+        read from the lines, QC records are created in batches and the chatter
+        notes of the contracts are logged in one go. The user gets a single
+        summary of the whole dispatch.
+        """
+        # 🚫 Block if any existing QC is still not done
+        active_qc = self.env['quality.control'].search(
+            [('const_contract_id', 'in', self.ids), ('state', '!=', 'done')])
+        self._check_dispatch_ready(
+            active_qc,
+            "You already have a QC in Draft or In Progress. Please finish it before creating a new one.")
+
+        # ✅ Build QC lines for the quantities not yet approved, kept up to date on each line
+        qc_vals_list = []
+        fully_approved = self.browse()
         for contract in self:
-            if not contract.warehouse_id:
-                raise ValidationError("Missing Warehouse on contract.")
-            if not contract.contract_id or not contract.contract_id.proc_offer_id:
-                raise ValidationError("Missing Vendor in the contract offer.")
-
-            # 🚫 Block if any existing QC is still not done
-            active_qc = contract.construction_quality_ids.filtered(lambda q: q.state != 'done')
-            if active_qc:
-                raise UserError(
-                    "You already have a QC in Draft or In Progress. Please finish it before creating a new one.")
-
-            # ✅ Build approved qty map only from passed (approved) lines
-            approved_qty_map = defaultdict(float)
-
-            for qc in contract.construction_quality_ids:
-                for line in qc.line_ids:
-                    if not line.product_id:
-                        continue
-                    key = (line.product_id.id, line.name or '', line.price_unit)
-                    if line.passed:
-                        approved_qty_map[key] += line.approved_qty or 0.0
-
-            # ✅ Now build QC lines for remaining qty
             qc_lines = []
-
             for line in contract.line_ids:
                 if not line.product_id or line.first_estimation_qty <= 0:
                     continue
 
-                key = (line.product_id.id, line.description or '', line.price or 0.0)
-                already_approved = approved_qty_map.get(key, 0.0)
-                remaining_qty = line.first_estimation_qty - already_approved
-
-                if remaining_qty > 0:
+                if line.qc_remaining_qty > 0:
                     qc_lines.append((0, 0, {
+                        'construction_line_id': line.id,
                         'product_id': line.product_id.id,
-                        'product_uom_qty': remaining_qty,
+                        'product_uom_qty': line.qc_remaining_qty,
                         'price_unit': line.price or 0.0,
                         'name': line.description or line.product_id.name,
                     }))
 
             if not qc_lines:
-                raise UserError("All products in this contract are fully approved. Nothing left for QC.")
+                fully_approved |= contract
+                continue
 
-            # ✅ Create QC
-            qc_vals = {
+            qc_vals_list.append({
                 'const_contract_id': contract.id,
                 'warehouse_id': contract.warehouse_id.id,
                 'partner_id': contract.contract_id.proc_offer_id.id,
                 'origin': contract.contract_number or f"Contract-{contract.id}",
                 'line_ids': qc_lines,
-            }
-
-            qc = self.env['quality.control'].sudo().create(qc_vals)
-            contract.message_post(body=_("📦 QC created for pending/rejected products. Ref: %s" % qc.name))
-
-        return True
-
+            })
+
+        if fully_approved:
+            raise UserError(self._dispatch_error_message(
+                "All products in this contract are fully approved. Nothing left for QC.", fully_approved))
+
+        # ✅ Create QC records, one create call per batch
+        qcs = self.env['quality.control'].sudo()
+        for vals_batch in split_every(QC_DISPATCH_BATCH_SIZE, qc_vals_list, list):
+            qcs |= qcs.create(vals_batch)
+        self._message_log_batch(bodies={
+            qc.const_contract_id.id: _("📦 QC created for pending/rejected products. Ref: %s", qc.name)
+            for qc in qcs
+        })
+        return self._dispatch_summary(_("%s Quality Control records created", len(qcs)), qcs)
+
+    @bmis_instrumented
     def action_send_to_property(self):
+        """
+        Create one Property Control per contract. Like the QC dispatch, the
+        selection is validated up front and records are created in batches.
+        """
+        # Block if any property control is not done
+        active_pc = self.env['property.control'].search(
+            [('const_contract_id', 'in', self.ids), ('state', '!=', 'done')])
+        self._check_dispatch_ready(
+            active_pc,
+            "You already have a Property Control in Draft or In Progress. Please finish it before creating a new one.")
+
+        # Build property control lines
+        pc_vals_list = []
+        empty = self.browse()
         for contract in self:
-            if not contract.warehouse_id:
-                raise ValidationError("Missing Warehouse on contract.")
-            if not contract.contract_id or not contract.contract_id.proc_offer_id:
-                raise ValidationError("Missing Vendor in the contract offer.")
-
-            # Block if any property control is not done
-            active_pc = contract.property_control_ids.filtered(lambda q: q.state != 'done')
-            if active_pc:
-                raise UserError(
-                    "You already have a Property Control in Draft or In Progress. Please finish it before creating a new one."
-                )
-
-            # Build property control lines
             pc_lines = []
             for line in contract.line_ids:
                 if not line.product_id or line.first_estimation_qty <= 0:
                     continue
 
                 pc_lines.append((0, 0, {
+                    'construction_line_id': line.id,
                     'product_id': line.product_id.id,
                     'product_uom_qty': line.first_estimation_qty,
                     'price_unit': line.price or 0.0,
@@ -263,21 +601,62 @@ class ConstructionControl(models.Model):
                 }))
 
             if not pc_lines:
-                raise UserError("No items left to send to Property Control.")
+                empty |= contract
+                continue
 
-            # Create property control record
-            pc_vals = {
+            pc_vals_list.append({
                 'const_contract_id': contract.id,
                 'warehouse_id': contract.warehouse_id.id,
                 'partner_id': contract.contract_id.proc_offer_id.id,
                 'origin': contract.contract_number or f"Contract-{contract.id}",
                 'line_ids': pc_lines,
-            }
+            })
+
+        if empty:
+            raise UserError(self._dispatch_error_message(
+                "No items left to send to Property Control.", empty))
+
+        # Create property control records, one create call per batch
+        pcs = self.env['property.control'].sudo()
+        for vals_batch in split_every(QC_DISPATCH_BATCH_SIZE, pc_vals_list, list):
+            pcs |= pcs.create(vals_batch)
+        self._message_log_batch(bodies={
+            pc.const_contract_id.id: _("🏗️ Property Control created. Ref: %s", pc.name) for pc in pcs
+        })
+        return self._dispatch_summary(_("%s Property Control records created", len(pcs)), pcs)
+
+    def action_enqueue_dispatch(self, kind):
+        """Dispatch the selection in the background, see construction.control.dispatch.job."""
+        job = self.env['construction.control.dispatch.job']._enqueue(self, kind)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Dispatch Job'),
+            'res_model': 'construction.control.dispatch.job',
+            'res_id': job.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
 
-            pc = self.env['property.control'].sudo().create(pc_vals)
-            contract.message_post(body=_("🏗️ Property Control created. Ref: %s" % pc.name))
+    dispatch_job_id = fields.Many2one(
+        'construction.control.dispatch.job',
+        string='Pending Dispatch',
+        compute='_compute_dispatch_job_id',
+        compute_sudo=True,
+        groups='egp_bmis.group_bmis_officer'
+    )
+    dispatch_job_progress = fields.Float(
+        related='dispatch_job_id.progress',
+        string='Dispatch Progress',
+        groups='egp_bmis.group_bmis_officer'
+    )
 
-        return True
+    def _compute_dispatch_job_id(self):
+        self.dispatch_job_id = False
+        jobs = self.env['construction.control.dispatch.job'].search(
+            [('contract_ids', 'in', self.ids), ('state', 'in', ('queued', 'running'))], order='id')
+        for job in jobs:
+            for contract in job.contract_ids & self:
+                contract.dispatch_job_id = job
 
     # //////////////////////////////////////////////////////
     quality_line_ids = fields.One2many(
@@ -285,10 +664,68 @@ class ConstructionControl(models.Model):
         string="Approved Quality Lines", store=False)
 
     @api.depends('construction_quality_ids.line_ids')
+    @bmis_instrumented
     def _compute_quality_lines(self):
         for contract in self:
             contract.quality_line_ids = contract.construction_quality_ids.mapped('line_ids').filtered(lambda l: l.passed)
 
+    ledger_ids = fields.One2many(
+        'construction.control.ledger', 'contract_id', string="QC/PC Ledger")
+
+    def _get_ledger_summary(self, source):
+        """
+        Summary rows of the selection for ``source`` ('qc' or 'pc'), read from
+        the pre-aggregated ledger and grouped by contract id.
+        """
+        summaries = defaultdict(list)
+        ledgers = self.env['construction.control.ledger'].search(
+            [('contract_id', 'in', self.ids), ('source', '=', source)])
+        for ledger in ledgers:
+            summaries[ledger.contract_id.id].append({
+                'product': ledger.product_id.display_name,
+                'approved_qty': ledger.approved_qty,
+                'quantity_sum': ledger.rejected_qty,
+                'price_total': ledger.price_total,
+                'line_count': ledger.line_count,
+            })
+        return summaries
+
+    @bmis_instrumented
+    def get_summary_html(self, kind):
+        """
+        Summary table of ``kind`` (see SUMMARY_KINDS) for one contract, called by
+        the form widget when its notebook page is opened.
+        """
+        self.ensure_one()
+        self.check_access_rights('read')
+        self.check_access_rule('read')
+        # refresh the rows queued by the control lines changed in this transaction
+        self.env['construction.control.ledger']._flush_pending()
+        return self._get_summary_html(kind)
+
+    def _get_summary_html(self, kind):
+        if not self.id:
+            return ''
+        source = SUMMARY_KINDS[kind][0]
+        # rows are only rewritten when their aggregates change, so the latest
+        # write date and the row count identify the state of the summary
+        [(last_write, count)] = self.env['construction.control.ledger']._read_group(
+            [('contract_id', '=', self.id), ('source', '=', source)],
+            aggregates=['write_date:max', '__count'],
+        )
+        return self._render_summary_html(kind, (last_write, count))
+
+    @tools.ormcache('self.id', 'kind', 'stamp', 'self.env.uid', 'self.env.lang')
+    def _render_summary_html(self, kind, stamp):
+        source, count_label = SUMMARY_KINDS[kind]
+        rows = self._get_ledger_summary(source)[self.id]
+        for row in rows:
+            row['avg_price'] = round(row['price_total'] / row['line_count'], 2) if row['line_count'] else 0
+        return str(self.env['ir.qweb']._render('egp_bmis.contract_summary_table', {
+            'rows': rows,
+            'count_label': str(count_label),
+        }))
+
     qc_line_summary_html = fields.Html(
         string="QC Summary",
         compute="_compute_qc_summary_html",
@@ -298,54 +735,10 @@ class ConstructionControl(models.Model):
 
 
     # start of function that compute approved quality products.
+    @bmis_instrumented
     def _compute_qc_summary_html(self):
         for contract in self:
-            summary = {}
-            for line in contract.quality_line_ids:
-                pid = line.product_id.id
-                if pid not in summary:
-                    summary[pid] = {
-                        'product': line.product_id.display_name,
-                        'approved_qty': 0,
-                        'quantity_sum': 0.0,
-                        'price_total': 0,
-                        'line_count': 0,
-                    }
-
-                summary[pid]['approved_qty'] += line.approved_qty or 0.0
-                summary[pid]['quantity_sum'] += line.product_uom_qty - (line.approved_qty or 0.0)
-                summary[pid]['price_total'] += (line.price_unit or 0.0)
-                summary[pid]['line_count'] += 1
-
-            html = """
-                <table style="width: 100%; border-collapse: collapse; font-size: 14px;">
-                    <thead>
-                        <tr style="background-color: #f5f5f5; color: #333;">
-                            <th style="border: 1px solid #ccc; padding: 8px;">🛒 Product</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">✅ Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">❌ Not Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">💰 Avg Price</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">📦 QC Count</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-
-            for data in summary.values():
-                avg_price = data['price_total'] / data['line_count'] if data['line_count'] else 0
-                html += f"""
-                    <tr style="border: 1px solid #ddd;">
-                        <td style="border: 1px solid #ccc; padding: 8px;">{data['product']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['approved_qty']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['quantity_sum']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{round(avg_price, 2)}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['line_count']}</td>
-                    </tr>
-                """
-
-            html += "</tbody></table>"
-            contract.qc_line_summary_html = html
-
+            contract.qc_line_summary_html = contract._get_summary_html('qc')
 
 
     pc_line_summary_html = fields.Html(
@@ -355,55 +748,10 @@ class ConstructionControl(models.Model):
         store=False,
     )
 
+    @bmis_instrumented
     def _compute_pc_summary_html(self):
         for contract in self:
-            summary = {}
-
-            # ✅ Use the actual One2many field from your model
-            for line in contract.property_line_ids:
-                pid = line.product_id.id
-                if pid not in summary:
-                    summary[pid] = {
-                        'product': line.product_id.display_name,
-                        'approved_qty': 0,
-                        'quantity_sum': 0.0,
-                        'price_total': 0,
-                        'line_count': 0,
-                    }
-
-                summary[pid]['approved_qty'] += line.approved_qty or 0.0
-                summary[pid]['quantity_sum'] += (line.product_uom_qty or 0.0) - (line.approved_qty or 0.0)
-                summary[pid]['price_total'] += line.price_unit or 0.0
-                summary[pid]['line_count'] += 1
-
-            html = """
-                <table style="width: 100%; border-collapse: collapse; font-size: 14px;">
-                    <thead>
-                        <tr style="background-color: #f5f5f5; color: #333;">
-                            <th style="border: 1px solid #ccc; padding: 8px;">🛒 Product</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">✅ Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">❌ Not Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">💰 Avg Price</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">📦 PC Count</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-
-            for data in summary.values():
-                avg_price = data['price_total'] / data['line_count'] if data['line_count'] else 0
-                html += f"""
-                    <tr style="border: 1px solid #ddd;">
-                        <td style="border: 1px solid #ccc; padding: 8px;">{data['product']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['approved_qty']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['quantity_sum']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{round(avg_price, 2)}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['line_count']}</td>
-                    </tr>
-                """
-
-            html += "</tbody></table>"
-            contract.pc_line_summary_html = html
+            contract.pc_line_summary_html = contract._get_summary_html('pc')
 
     # this function show the data sent to the inventory.
     def action_open_const_quality_controls(self):
@@ -424,6 +772,7 @@ class ConstructionControl(models.Model):
     )
 
     @api.depends('property_control_ids.line_ids')
+    @bmis_instrumented
     def _compute_property_lines(self):
         """
         Compute approved property lines based on state='done'.
@@ -440,56 +789,45 @@ class ConstructionControl(models.Model):
         store=False,
     )
 
+    @bmis_instrumented
     def _compute_property_summary_html(self):
         """
         Compute HTML summary table for approved property lines.
         """
         for contract in self:
-            summary = {}
-            for line in contract.property_line_ids:
-                pid = line.product_id.id
-                if pid not in summary:
-                    summary[pid] = {
-                        'product': line.product_id.display_name,
-                        'approved_qty': 0,
-                        'quantity_sum': 0.0,
-                        'price_total': 0,
-                        'line_count': 0,
-                    }
-
-                summary[pid]['approved_qty'] += line.approved_qty or 0.0
-                summary[pid]['quantity_sum'] += line.product_uom_qty - (line.approved_qty or 0.0)
-                summary[pid]['price_total'] += (line.price_unit or 0.0)
-                summary[pid]['line_count'] += 1
-
-            html = """
-                <table style="width: 100%; border-collapse: collapse; font-size: 14px;">
-                    <thead>
-                        <tr style="background-color: #f5f5f5; color: #333;">
-                            <th style="border: 1px solid #ccc; padding: 8px;">🛒 Product</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">✅ Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">❌ Not Approved Qty</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">💰 Avg Price</th>
-                            <th style="border: 1px solid #ccc; padding: 8px;">📦 Property Count</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-
-            for data in summary.values():
-                avg_price = data['price_total'] / data['line_count'] if data['line_count'] else 0
-                html += f"""
-                    <tr style="border: 1px solid #ddd;">
-                        <td style="border: 1px solid #ccc; padding: 8px;">{data['product']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['approved_qty']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['quantity_sum']}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{round(avg_price, 2)}</td>
-                        <td style="border: 1px solid #ccc; padding: 8px; text-align: center;">{data['line_count']}</td>
-                    </tr>
-                """
-
-            html += "</tbody></table>"
-            contract.property_line_summary_html = html
+            contract.property_line_summary_html = contract._get_summary_html('property')
+
+    def action_export_lines(self, file_format='xlsx'):
+        """Download the bill of quantities of the selection as a streamed XLSX or CSV file."""
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/egp_bmis/construction_control/export?ids=%s&file_format=%s' % (
+                ','.join(str(contract_id) for contract_id in self.ids), file_format),
+            'target': 'self',
+        }
+
+    @bmis_instrumented
+    def action_print_batch(self):
+        """Print the contract report of the selection in the background into one ZIP archive."""
+        batch = self.env['construction.control.print.batch']._create_for_contracts(self)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Print Batch'),
+            'res_model': 'construction.control.print.batch',
+            'res_id': batch.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
+    def action_open_progress_snapshots(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Progress'),
+            'res_model': 'construction.control.snapshot',
+            'view_mode': 'graph,pivot,tree',
+            'domain': [('contract_id', 'in', self.ids)],
+            'target': 'current',
+        }
 
     # this function show the data sent to the property.
     def action_open_const_property(self):
@@ -520,6 +858,8 @@ class ConstructionControlLine(models.Model):
         ondelete='cascade'
     )
 
+    active = fields.Boolean(string='Active', default=True)
+
     product_id = fields.Many2one(
         'product.product',
         string="Product",
@@ -588,7 +928,86 @@ class ConstructionControlLine(models.Model):
     # Partial deliveries
     part_ids = fields.One2many('construction.control.line.part', 'line_id', string='Partial Deliveries')
 
+    delivered_qty = fields.Float(
+        string='Delivered Quantity',
+        compute="_compute_delivered_qty",
+        store=True,
+        help='Sum of the partial deliveries, in the unit of measure of the line.'
+    )
+
+    remaining_qty = fields.Float(
+        string='Remaining Quantity',
+        compute="_compute_delivered_qty",
+        store=True,
+        help='Initial Estimation - Delivered Quantity'
+    )
+
+    delivery_progress = fields.Float(
+        string='Delivery Progress (%)',
+        compute="_compute_delivered_qty",
+        store=True,
+        group_operator='avg'
+    )
+
+    # QC/PC lines dispatched for this line, see construction_line_id
+    qc_line_ids = fields.One2many('quality.control.line', 'construction_line_id', string='QC Lines')
+    pc_line_ids = fields.One2many('property.control.line', 'construction_line_id', string='Property Lines')
+
+    qc_approved_qty = fields.Float(
+        string='QC Approved Quantity',
+        compute="_compute_reconciled_qty",
+        store=True,
+        help='Quantity approved by the passed QC lines of this item.'
+    )
+
+    qc_remaining_qty = fields.Float(
+        string='QC Remaining Quantity',
+        compute="_compute_reconciled_qty",
+        store=True,
+        help='Initial Estimation - QC Approved Quantity'
+    )
+
+    pc_received_qty = fields.Float(
+        string='Property Received Quantity',
+        compute="_compute_reconciled_qty",
+        store=True,
+        help='Quantity approved by the done Property Control lines of this item.'
+    )
+
+    qc_approved_value = fields.Float(
+        string='QC Approved Value',
+        compute="_compute_line_values",
+        store=True,
+        help='QC Approved Quantity × Unit Price'
+    )
+
+    delivered_value = fields.Float(
+        string='Delivered Value',
+        compute="_compute_line_values",
+        store=True,
+        help='Delivered Quantity × Unit Price'
+    )
+
+    variance_value = fields.Float(
+        string='Estimation Variance Value',
+        compute="_compute_line_values",
+        store=True,
+        help='Estimation Difference × Unit Price'
+    )
+
+    def init(self):
+        create_bmis_indexes(self._cr, self._table)
+
+    def write(self, vals):
+        if not set(vals) & set(REVISION_FIELDS):
+            return super().write(vals)
+        old_values = {line['id']: line for line in self.read(REVISION_FIELDS)}
+        res = super().write(vals)
+        self.env['construction.control.line.revision']._log_revisions(old_values, self)
+        return res
+
     @api.depends('first_estimation_qty', 'price')
+    @bmis_instrumented
     def _compute_sub_total(self):
         """
         Computes subtotal = quantity × price.
@@ -596,7 +1015,92 @@ class ConstructionControlLine(models.Model):
         for rec in self:
             rec.sub_total = rec.first_estimation_qty * rec.price if rec.first_estimation_qty and rec.price else 0.0
 
+    @api.depends('part_ids.qty', 'part_ids.unit_of_measure', 'unit_measure', 'first_estimation_qty')
+    @bmis_instrumented
+    def _compute_delivered_qty(self):
+        """
+        Sums the partial deliveries of each line per unit of measure first, so
+        that every (delivery unit, line unit) pair is converted only once.
+        """
+        for rec in self:
+            qty_per_uom = defaultdict(float)
+            for part in rec.part_ids:
+                qty_per_uom[part.unit_of_measure] += part.qty
+            delivered = 0.0
+            for uom, qty in qty_per_uom.items():
+                if uom and rec.unit_measure and uom != rec.unit_measure:
+                    qty = uom._compute_quantity(qty, rec.unit_measure, round=False, raise_if_failure=False)
+                delivered += qty
+            rec.delivered_qty = delivered
+            rec.remaining_qty = rec.first_estimation_qty - delivered
+            rec.delivery_progress = 100.0 * delivered / rec.first_estimation_qty if rec.first_estimation_qty else 0.0
+
+    @api.depends('first_estimation_qty',
+                 'qc_line_ids.approved_qty', 'qc_line_ids.passed',
+                 'pc_line_ids.approved_qty', 'pc_line_ids.state')
+    @bmis_instrumented
+    def _compute_reconciled_qty(self):
+        """
+        Approved quantities of the linked QC/PC lines, summed with one grouped
+        query per model for the whole batch of lines being recomputed.
+        """
+        line_ids = self._origin.ids
+        qc_approved = dict(self.env['quality.control.line'].sudo()._read_group(
+            [('construction_line_id', 'in', line_ids), ('passed', '=', True)],
+            ['construction_line_id'], ['approved_qty:sum']))
+        pc_received = dict(self.env['property.control.line'].sudo()._read_group(
+            [('construction_line_id', 'in', line_ids), ('state', '=', 'done')],
+            ['construction_line_id'], ['approved_qty:sum']))
+        for rec in self:
+            rec.qc_approved_qty = qc_approved.get(rec._origin, 0.0)
+            rec.qc_remaining_qty = rec.first_estimation_qty - rec.qc_approved_qty
+            rec.pc_received_qty = pc_received.get(rec._origin, 0.0)
+
+    @api.depends('price', 'qc_approved_qty', 'delivered_qty', 'estimation_difference')
+    @bmis_instrumented
+    def _compute_line_values(self):
+        for rec in self:
+            rec.qc_approved_value = rec.qc_approved_qty * rec.price
+            rec.delivered_value = rec.delivered_qty * rec.price
+            rec.variance_value = rec.estimation_difference * rec.price
+
+    @api.model
+    def _link_control_lines(self):
+        """
+        Link the QC/PC lines created before construction_line_id existed to
+        their construction line. Lines are matched on contract and product,
+        preferring the same description, then the closest unit price.
+        """
+        for control_model, line_model in (('quality.control', 'quality.control.line'),
+                                          ('property.control', 'property.control.line')):
+            parent = self.env[control_model]._fields['line_ids'].inverse_name
+            self.env.cr.execute("""
+                WITH candidates AS (
+                    SELECT DISTINCT ON (cl.id) cl.id AS control_line_id, l.id AS line_id
+                      FROM {line_table} cl
+                      JOIN {control_table} c ON c.id = cl.{parent}
+                      JOIN construction_control_line l ON l.construction_control_id = c.const_contract_id
+                                                      AND l.product_id = cl.product_id
+                     WHERE cl.construction_line_id IS NULL
+                  ORDER BY cl.id,
+                           COALESCE(l.description, '') = COALESCE(cl.name, '') DESC,
+                           ABS(COALESCE(l.price, 0) - COALESCE(cl.price_unit, 0)),
+                           l.id
+                )
+                UPDATE {line_table} cl
+                   SET construction_line_id = candidates.line_id
+                  FROM candidates
+                 WHERE cl.id = candidates.control_line_id
+            """.format(
+                line_table=self.env[line_model]._table,
+                control_table=self.env[control_model]._table,
+                parent=parent,
+            ))
+            self.env[line_model].invalidate_model(['construction_line_id'])
+        self.invalidate_model(['qc_line_ids', 'pc_line_ids'])
+
     @api.depends('first_estimation_qty', 'second_estimation_qty')
+    @bmis_instrumented
     def _compute_difference_and_complete(self):
         """
         Calculates numeric difference between estimations.
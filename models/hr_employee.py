@@ -0,0 +1,37 @@
+from odoo import models, fields, _
+
+
+class HrEmployee(models.Model):
+    _inherit = 'hr.employee'
+
+    bmis_board_member_ids = fields.One2many(
+        'const.board.member',
+        'employee_id',
+        string='Construction Board Memberships',
+        groups='egp_bmis.group_bmis_officer'
+    )
+    bmis_contract_count = fields.Integer(
+        string='Construction Contracts',
+        compute='_compute_bmis_contract_count',
+        groups='egp_bmis.group_bmis_officer'
+    )
+
+    def _compute_bmis_contract_count(self):
+        counts = {
+            employee.id: count
+            for employee, count in self.env['const.board.member']._read_group(
+                [('employee_id', 'in', self.ids), ('const_control_id', '!=', False)],
+                ['employee_id'], ['const_control_id:count_distinct'])
+        }
+        for employee in self:
+            employee.bmis_contract_count = counts.get(employee.id, 0)
+
+    def action_open_bmis_contracts(self):
+        self.ensure_one()
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Construction Contracts'),
+            'res_model': 'construction.control',
+            'view_mode': 'tree,form',
+            'domain': [('board_member_ids.employee_id', '=', self.id)],
+        }
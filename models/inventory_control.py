@@ -0,0 +1,68 @@
+from odoo import models, fields
+
+from .bmis_indexes import create_bmis_indexes
+
+
+class QualityControl(models.Model):
+    _name = 'quality.control'
+    _inherit = ['quality.control', 'construction.control.ledger.mixin']
+
+    _ledger_source = 'qc'
+    _ledger_trigger_fields = ('const_contract_id', 'state')
+
+    def _ledger_lines(self):
+        return self.line_ids
+
+    def init(self):
+        super().init()
+        create_bmis_indexes(self._cr, self._table)
+
+
+class QualityControlLine(models.Model):
+    _name = 'quality.control.line'
+    _inherit = ['quality.control.line', 'construction.control.ledger.mixin']
+
+    # any write may change a stored compute of the line, so all of them queue the ledger
+    _ledger_source = 'qc'
+
+    construction_line_id = fields.Many2one(
+        'construction.control.line',
+        string='Construction Item',
+        ondelete='set null'
+    )
+
+    def init(self):
+        super().init()
+        create_bmis_indexes(self._cr, self._table)
+
+
+class PropertyControl(models.Model):
+    _name = 'property.control'
+    _inherit = ['property.control', 'construction.control.ledger.mixin']
+
+    _ledger_source = 'pc'
+    _ledger_trigger_fields = ('const_contract_id', 'state')
+
+    def _ledger_lines(self):
+        return self.line_ids
+
+    def init(self):
+        super().init()
+        create_bmis_indexes(self._cr, self._table)
+
+
+class PropertyControlLine(models.Model):
+    _name = 'property.control.line'
+    _inherit = ['property.control.line', 'construction.control.ledger.mixin']
+
+    _ledger_source = 'pc'
+
+    construction_line_id = fields.Many2one(
+        'construction.control.line',
+        string='Construction Item',
+        ondelete='set null'
+    )
+
+    def init(self):
+        super().init()
+        create_bmis_indexes(self._cr, self._table)
@@ -0,0 +1,13 @@
+from odoo import models, fields
+
+
+class ResUsers(models.Model):
+    _inherit = 'res.users'
+
+    bmis_warehouse_ids = fields.Many2many(
+        'stock.warehouse',
+        'bmis_warehouse_user_rel',
+        'user_id', 'warehouse_id',
+        string='BMIS Warehouses',
+        help='Warehouses whose construction contracts this user sees as an EGP BMIS Warehouse User.'
+    )
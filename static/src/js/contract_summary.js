@@ -0,0 +1,47 @@
+/** @odoo-module **/
+
+import { Component, markup, onWillStart, onWillUpdateProps, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+
+/**
+ * Approved QC / Property products table of a construction contract.
+ * The table is only fetched once the widget is mounted, i.e. when the user
+ * opens the notebook page holding it.
+ */
+export class ContractSummary extends Component {
+    static template = "egp_bmis.ContractSummary";
+    static props = {
+        ...standardWidgetProps,
+        kind: { type: String },
+    };
+
+    setup() {
+        this.orm = useService("orm");
+        this.state = useState({ html: "" });
+        onWillStart(() => this.load(this.props));
+        onWillUpdateProps((nextProps) => {
+            if (nextProps.record.resId !== this.props.record.resId) {
+                return this.load(nextProps);
+            }
+        });
+    }
+
+    async load(props) {
+        const { resId, resModel } = props.record;
+        if (!resId) {
+            this.state.html = "";
+            return;
+        }
+        const html = await this.orm.call(resModel, "get_summary_html", [[resId], props.kind]);
+        this.state.html = markup(html);
+    }
+}
+
+export const contractSummary = {
+    component: ContractSummary,
+    extractProps: ({ attrs }) => ({ kind: attrs.kind }),
+};
+
+registry.category("view_widgets").add("bmis_contract_summary", contractSummary);
@@ -0,0 +1,12 @@
+from . import test_ledger
+from . import test_report
+from . import test_print_batch
+from . import test_dispatch_job
+from . import test_remeasure
+from . import test_reconciliation
+from . import test_line_part
+from . import test_boq_import
+from . import test_deadlines
+from . import test_access
+from . import test_contract
+from . import test_revision
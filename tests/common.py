@@ -0,0 +1,60 @@
+from itertools import count
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+_contract_numbers = count(1)
+
+
+class BmisCommon(TransactionCase):
+    """Contracts with a few lines, and the helpers to dispatch them to QC/PC."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.warehouse = cls.env['stock.warehouse'].search([('company_id', '=', cls.env.company.id)], limit=1)
+        cls.uom_unit = cls.env.ref('uom.product_uom_unit')
+        cls.category_a = cls.env['product.category'].create({'name': 'BMIS Test Category A'})
+        cls.category_b = cls.env['product.category'].create({'name': 'BMIS Test Category B'})
+        cls.products = cls.env['product.product'].create([{
+            'name': f'BMIS Test Product {index}',
+            'default_code': f'BMIS-TEST-{index}',
+            'categ_id': (cls.category_a if index % 2 else cls.category_b).id,
+            'uom_id': cls.uom_unit.id,
+        } for index in range(4)])
+        # the procurement contracts come from egp_requirements, the dispatch needs one with an offer
+        cls.proc_contract = cls.env['proc.contract'].search([('proc_offer_id', '!=', False)], limit=1)
+
+    @classmethod
+    def _create_contract(cls, lines=2, **vals):
+        return cls.env['construction.control'].create(dict({
+            'contract_number': 'BMIS-TEST-%04d' % next(_contract_numbers),
+            'contract_date': fields.Date.today(),
+            'warehouse_id': cls.warehouse.id,
+            'state': 'in_progress',
+            'line_ids': [(0, 0, {
+                'product_id': product.id,
+                'unit_measure': product.uom_id.id,
+                'description': f'Item {index}',
+                'first_estimation_qty': 10.0,
+                'second_estimation_qty': 8.0,
+                'price': 5.0 + index,
+            }) for index, product in enumerate(cls.products[:lines])],
+        }, **vals))
+
+    def _require_dispatch(self):
+        if not self.proc_contract or not self.warehouse:
+            self.skipTest("Dispatching needs a procurement contract with an offer and a warehouse.")
+
+    def _create_dispatchable_contract(self, lines=2, **vals):
+        self._require_dispatch()
+        return self._create_contract(lines=lines, contract_id=self.proc_contract.id, **vals)
+
+    def _approve_qc(self, contracts, ratio=1.0):
+        """Pass the open QC lines of ``contracts`` for ``ratio`` of their quantity and close the QCs."""
+        qcs = contracts.construction_quality_ids.filtered(lambda q: q.state != 'done')
+        for line in qcs.line_ids:
+            line.write({'passed': True, 'approved_qty': line.product_uom_qty * ratio})
+        qcs.write({'state': 'done'})
+        return qcs
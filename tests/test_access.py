@@ -0,0 +1,79 @@
+from odoo.addons.base.tests.common import new_test_user
+from odoo.exceptions import AccessError
+from odoo.tests import Form, tagged
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestAccess(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.other_warehouse = cls.env['stock.warehouse'].create({'name': 'BMIS Other Warehouse', 'code': 'BMOW'})
+        cls.manager_user = new_test_user(
+            cls.env, 'bmis_access_manager', groups='base.group_user,egp_bmis.group_bmis_project_manager')
+        cls.manager = cls.env['hr.employee'].create({'name': 'BMIS Access Manager', 'user_id': cls.manager_user.id})
+        cls.warehouse_user = new_test_user(
+            cls.env, 'bmis_access_warehouse', groups='base.group_user,egp_bmis.group_bmis_warehouse_user',
+            bmis_warehouse_ids=[(6, 0, cls.other_warehouse.ids)])
+
+        cls.managed = cls._create_contract(Project_manager=cls.manager.id)
+        cls.other = cls._create_contract(warehouse_id=cls.other_warehouse.id)
+        cls.contracts = cls.managed | cls.other
+        cls.env['construction.control.line.part'].create([{
+            'line_id': contract.line_ids[0].id, 'qty': 1.0, 'location': 'Site',
+        } for contract in cls.contracts])
+
+    def _visible(self, user, model, domain):
+        return self.env[model].with_user(user).search(domain)
+
+    def test_project_manager_scope(self):
+        contracts = self._visible(self.manager_user, 'construction.control', [('id', 'in', self.contracts.ids)])
+        self.assertEqual(contracts, self.managed)
+        lines = self._visible(self.manager_user, 'construction.control.line',
+                              [('construction_control_id', 'in', self.contracts.ids)])
+        self.assertEqual(lines, self.managed.line_ids)
+        parts = self._visible(self.manager_user, 'construction.control.line.part',
+                              [('line_id', 'in', self.contracts.line_ids.ids)])
+        self.assertEqual(parts.line_id.construction_control_id, self.managed)
+        with self.assertRaises(AccessError):
+            self.other.with_user(self.manager_user).read(['contract_number'])
+
+    def test_warehouse_user_scope(self):
+        contracts = self._visible(self.warehouse_user, 'construction.control', [('id', 'in', self.contracts.ids)])
+        self.assertEqual(contracts, self.other)
+        lines = self._visible(self.warehouse_user, 'construction.control.line',
+                              [('construction_control_id', 'in', self.contracts.ids)])
+        self.assertEqual(lines, self.other.line_ids)
+        with self.assertRaises(AccessError):
+            self.managed.with_user(self.warehouse_user).read(['contract_number'])
+
+    def test_form_read(self):
+        for user, contract in ((self.manager_user, self.managed), (self.warehouse_user, self.other)):
+            form = Form(contract.with_user(user))
+            self.assertEqual(form.contract_number, contract.contract_number)
+            self.assertEqual(contract.with_user(user).qc_count, 0)
+            arch = contract.with_user(user).get_views([(False, 'form')])['views']['form']['arch']
+            self.assertNotIn('name="dispatch_job_id"', arch, "Dispatch jobs are for officers only")
+
+    def test_summary_access(self):
+        self.assertIsInstance(self.managed.with_user(self.manager_user).get_summary_html('qc'), str)
+        # rendered and cached for the officer, still refused to a user who cannot read the contract
+        self.other.get_summary_html('qc')
+        with self.assertRaises(AccessError):
+            self.other.with_user(self.manager_user).get_summary_html('qc')
+
+    def test_ledger_scope(self):
+        self._require_dispatch()
+        contracts = self._create_dispatchable_contract(Project_manager=self.manager.id) \
+            | self._create_dispatchable_contract(warehouse_id=self.other_warehouse.id)
+        contracts.action_send_to_quality_control()
+        self._approve_qc(contracts)
+        self.env.cr.flush()
+
+        for user, contract in ((self.manager_user, contracts[0]), (self.warehouse_user, contracts[1])):
+            ledger = self._visible(user, 'construction.control.ledger', [('contract_id', 'in', contracts.ids)])
+            self.assertTrue(ledger)
+            self.assertEqual(ledger.contract_id, contract)
@@ -0,0 +1,144 @@
+import base64
+import io
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from odoo.addons.egp_bmis.wizard import construction_control_boq_import
+from odoo.addons.egp_bmis.wizard.construction_control_boq_import import openpyxl
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestBoqImport(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.contract = cls._create_contract(lines=0)
+
+    def _wizard(self, content, filename='boq.csv'):
+        if isinstance(content, str):
+            content = content.encode()
+        return self.env['construction.control.boq.import'].create({
+            'contract_id': self.contract.id,
+            'file': base64.b64encode(content),
+            'filename': filename,
+        })
+
+    def _import_error(self, content):
+        # a failed import is rolled back with the request
+        with self.assertRaises(UserError) as error, self.env.cr.savepoint():
+            self._wizard(content).action_import()
+        self.contract.invalidate_recordset(['line_ids'])
+        self.assertFalse(self.contract.line_ids)
+        return str(error.exception)
+
+    def test_import_csv(self):
+        self._wizard(
+            "Internal Reference,Description,UoM,Qty,Unit Price,Max Qty\n"
+            "BMIS-TEST-0,Foundations,Units,12,3.5,15\n"
+            ",,,,,\n"
+            "BMIS Test Product 1,,,4,10,\n"
+        ).action_import()
+
+        first, second = self.contract.line_ids.sorted('id')
+        self.assertEqual((first.product_id, first.description), (self.products[0], 'Foundations'))
+        self.assertEqual((first.first_estimation_qty, first.price, first.max_qty), (12.0, 3.5, 15.0))
+        self.assertEqual(first.sub_total, 42.0)
+        self.assertEqual((second.product_id, second.unit_measure), (self.products[1], self.products[1].uom_id))
+        self.assertEqual(second.first_estimation_qty, 4.0)
+        self.assertIn("2 lines", self.contract.message_ids[0].body)
+
+    def test_import_in_batches(self):
+        content = "product,first estimation,price\n" + "".join(
+            f"BMIS-TEST-{index % 4},{index + 1},2\n" for index in range(5))
+        with patch.object(construction_control_boq_import, 'BOQ_IMPORT_BATCH_SIZE', 2):
+            self._wizard(content).action_import()
+        lines = self.contract.line_ids.sorted('id')
+        self.assertEqual(lines.mapped('first_estimation_qty'), [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(lines.product_id, self.products)
+
+    def test_invalid_rows(self):
+        kilogram = self.env.ref('uom.product_uom_kgm')
+        with patch.object(construction_control_boq_import, 'BOQ_IMPORT_BATCH_SIZE', 2):
+            message = self._import_error(
+                "product,unit,qty,price\n"
+                "BMIS-TEST-0,,1,1\n"
+                "BMIS-TEST-0,,1,1\n"
+                "NO-SUCH-PRODUCT,,1,1\n"
+                "BMIS-TEST-1,,many,1\n"
+                "BMIS-TEST-2,,-1,1\n"
+                f"BMIS-TEST-3,{kilogram.name},1,1\n"
+                "BMIS-TEST-3,no such unit,1,1\n"
+            )
+        for row in ("Row 4:", "Row 5:", "Row 6:", "Row 7:", "Row 8:"):
+            self.assertIn(row, message)
+        self.assertNotIn("Row 2:", message)
+
+    def test_non_finite_numbers(self):
+        message = self._import_error(
+            "product,qty,price\n"
+            "BMIS-TEST-0,nan,1\n"
+            "BMIS-TEST-1,1,inf\n"
+            "BMIS-TEST-2,-inf,1\n"
+        )
+        for row in ("Row 2:", "Row 3:", "Row 4:"):
+            self.assertIn(row, message)
+
+    def test_invalid_csv(self):
+        message = self._import_error("product,qty,price\nB\xe9ton,1,1\n".encode('latin-1'))
+        self.assertIn("UTF-8", message)
+
+    def test_invalid_xlsx(self):
+        if openpyxl is None:
+            self.skipTest("openpyxl is not installed")
+        with self.assertRaises(UserError) as error:
+            self._wizard(b"not a zip archive", filename='boq.xlsx').action_import()
+        self.assertIn("not a valid XLSX file", str(error.exception))
+
+    def test_error_count(self):
+        with patch.object(construction_control_boq_import, 'BOQ_IMPORT_MAX_ERRORS', 2):
+            message = self._import_error("product,qty,price\n" + "NO-SUCH-PRODUCT,1,1\n" * 5)
+        self.assertIn("3 more errors", message)
+
+    def test_missing_columns(self):
+        message = self._import_error("product,description\nBMIS-TEST-0,Foundations\n")
+        self.assertIn("Missing columns", message)
+
+    def test_empty_file(self):
+        self._import_error("product,qty,price\n")
+
+    def test_import_xlsx(self):
+        if openpyxl is None:
+            self.skipTest("openpyxl is not installed")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(['Product Code', 'Quantity', 'Price', 'Second Estimation'])
+        sheet.append(['BMIS-TEST-2', 6, 4.5, 5])
+        sheet.append([None, None, None, None])
+        sheet.append(['BMIS-TEST-3', 2, 1, None])
+        file = io.BytesIO()
+        workbook.save(file)
+
+        self._wizard(file.getvalue(), filename='boq.xlsx').action_import()
+        first, second = self.contract.line_ids.sorted('id')
+        self.assertEqual((first.product_id, first.first_estimation_qty, first.price), (self.products[2], 6.0, 4.5))
+        self.assertEqual(first.second_estimation_qty, 5.0)
+        self.assertEqual(second.product_id, self.products[3])
+
+    def test_import_xlsx_numeric_code(self):
+        if openpyxl is None:
+            self.skipTest("openpyxl is not installed")
+        product = self.env['product.product'].create({'name': 'BMIS Numeric Code', 'default_code': '40017'})
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['Product', 'Qty', 'Price'])
+        # read back as the float 40017.0
+        workbook.active.append([40017.0, 3, 2])
+        file = io.BytesIO()
+        workbook.save(file)
+
+        self._wizard(file.getvalue(), filename='boq.xlsx').action_import()
+        self.assertEqual(self.contract.line_ids.product_id, product)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.tests import tagged
+
+from odoo.addons.egp_bmis.models.construction_pro import PROC_CONTRACT_SYNC_PARAM
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestContract(BmisCommon):
+
+    def test_overdue(self):
+        today = fields.Date.today()
+        overdue = self._create_contract(contract_end_date=today - timedelta(days=1))
+        contracts = overdue | self._create_contract(contract_end_date=today - timedelta(days=1), state='done') \
+            | self._create_contract(contract_end_date=False) \
+            | self._create_contract(contract_end_date=today) \
+            | self._create_contract(contract_end_date=today + timedelta(days=3), state='draft')
+        self.assertEqual(contracts.filtered('is_overdue'), overdue)
+
+        Contract = self.env['construction.control']
+        for operator, value, expected in (
+            ('=', True, overdue),
+            ('!=', False, overdue),
+            ('=', False, contracts - overdue),
+            ('!=', True, contracts - overdue),
+        ):
+            self.assertEqual(
+                Contract.search([('id', 'in', contracts.ids), ('is_overdue', operator, value)]), expected,
+                f"is_overdue {operator} {value}")
+
+    def test_archive_done_only(self):
+        done = self._create_contract(state='done')
+        draft = self._create_contract(state='draft')
+        with self.assertRaises(ValidationError) as error:
+            (done | draft).write({'active': False})
+        self.assertIn(draft.contract_number, str(error.exception))
+        self.assertNotIn(done.contract_number, str(error.exception))
+        self.assertTrue(done.active and draft.active)
+
+        estimated_value = done.estimated_value
+        done.active = False
+        self.assertFalse(done.line_ids.filtered('active'), "Lines are archived with their contract")
+        self.assertFalse(self.env['construction.control.line'].search([('construction_control_id', '=', done.id)]))
+        self.assertEqual(len(done.line_ids), 2)
+        self.assertEqual(done.estimated_value, estimated_value, "Archived lines stay in the rollups")
+
+        done.active = True
+        self.assertTrue(all(done.line_ids.mapped('active')))
+
+    def test_unlink_not_done(self):
+        done = self._create_contract(state='done')
+        draft = self._create_contract(state='draft')
+        with self.assertRaises(ValidationError) as error:
+            (draft | done).unlink()
+        self.assertIn(done.contract_number, str(error.exception), "The whole selection is checked")
+        self.assertTrue(done.exists() and draft.exists())
+
+        lines = draft.line_ids
+        draft.unlink()
+        self.assertFalse(lines.exists())
+
+    def test_rollups(self):
+        contract = self._create_contract(lines=3)
+        first, second, third = contract.line_ids.sorted('id')
+        self.env['construction.control.line.part'].create({'line_id': first.id, 'qty': 4.0, 'location': 'Site'})
+        third.active = False
+        # a change on an archived line still reaches the contract
+        third.price = 20.0
+
+        self.env.flush_all()
+        contract.invalidate_recordset()
+        lines = first | second | third
+        for fname, line_fname in (
+            ('estimated_value', 'sub_total'),
+            ('approved_value', 'qc_approved_value'),
+            ('delivered_value', 'delivered_value'),
+            ('variance_value', 'variance_value'),
+        ):
+            self.assertAlmostEqual(contract[fname], sum(lines.mapped(line_fname)), msg=fname)
+        self.assertAlmostEqual(contract.estimated_value, 10.0 * (5.0 + 6.0 + 20.0))
+        self.assertAlmostEqual(contract.delivered_value, 4.0 * 5.0)
+
+    def test_sync_proc_contracts(self):
+        if not self.proc_contract:
+            self.skipTest("The sync needs a procurement contract.")
+        contract = self._create_contract(lines=0, contract_id=self.proc_contract.id)
+        contract.contract_number = 'BMIS-STALE'
+        ICP = self.env['ir.config_parameter'].sudo()
+        last_sync = fields.Datetime.now() - timedelta(hours=1)
+        ICP.set_param(PROC_CONTRACT_SYNC_PARAM, fields.Datetime.to_string(last_sync))
+
+        def set_write_date(date):
+            self.env.flush_all()
+            self.env.cr.execute("UPDATE proc_contract SET write_date = %s WHERE id = %s", [date, self.proc_contract.id])
+            self.env.invalidate_all()
+
+        Contract = type(self.env['construction.control'])
+        sync_from_proc_contract = Contract._sync_from_proc_contract
+        synced = []
+
+        def _sync_from_proc_contract(records):
+            synced.extend(records.ids)
+            return sync_from_proc_contract(records)
+
+        def run_sync():
+            synced.clear()
+            with patch.object(Contract, '_sync_from_proc_contract', _sync_from_proc_contract):
+                self.env['construction.control']._cron_sync_proc_contracts()
+            return fields.Datetime.to_datetime(ICP.get_param(PROC_CONTRACT_SYNC_PARAM))
+
+        set_write_date(last_sync - timedelta(days=1))
+        watermark = run_sync()
+        self.assertNotIn(contract.id, synced, "Unchanged procurement contracts are not read")
+        self.assertEqual(contract.contract_number, 'BMIS-STALE')
+        self.assertGreater(watermark, last_sync, "The watermark advances")
+
+        set_write_date(watermark)
+        run_sync()
+        self.assertIn(contract.id, synced)
+        self.assertEqual(contract.contract_number, self.proc_contract.contract_number)
@@ -0,0 +1,92 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.addons.base.tests.common import new_test_user
+from odoo.tests import tagged
+
+from odoo.addons.egp_bmis.models import construction_pro
+from odoo.addons.egp_bmis.models.construction_pro import DEADLINE_CURSOR_PARAM
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestDeadlines(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.manager_user = new_test_user(cls.env, 'bmis_deadline_manager', groups='base.group_user')
+        cls.manager = cls.env['hr.employee'].create({'name': 'BMIS Project Manager', 'user_id': cls.manager_user.id})
+        cls.activity_type = cls.env.ref('egp_bmis.mail_activity_type_contract_deadline')
+        cls.ICP = cls.env['ir.config_parameter'].sudo()
+
+    def setUp(self):
+        super().setUp()
+        self.cursors = []
+        self.patch(self.env.cr, 'commit', lambda: self.cursors.append(int(self.ICP.get_param(DEADLINE_CURSOR_PARAM))))
+
+    def _create_due_contract(self, days=5, **vals):
+        return self._create_contract(lines=1, **dict({
+            'Project_manager': self.manager.id,
+            'contract_end_date': fields.Date.today() + timedelta(days=days),
+        }, **vals))
+
+    def _activities(self, contracts):
+        return self.env['mail.activity'].search([
+            ('res_model', '=', 'construction.control'),
+            ('res_id', 'in', contracts.ids),
+            ('activity_type_id', '=', self.activity_type.id),
+        ])
+
+    def test_deadline_activities(self):
+        due = self._create_due_contract()
+        later = self._create_due_contract(days=60)
+        done = self._create_due_contract(state='done')
+        unmanaged = self._create_due_contract(Project_manager=False)
+        delivered = self._create_due_contract()
+        self.env['construction.control.line.part'].create({
+            'line_id': delivered.line_ids.id, 'qty': 10.0, 'location': 'Site'})
+
+        self.env['construction.control']._cron_check_deadlines()
+        activity = self._activities(due | later | done | unmanaged | delivered)
+        self.assertEqual(activity.res_id, due.id)
+        self.assertEqual(activity.user_id, self.manager_user)
+        self.assertEqual(activity.date_deadline, due.contract_end_date)
+        self.assertEqual(self.ICP.get_param(DEADLINE_CURSOR_PARAM), '0', "A finished run resets the cursor")
+
+        # a second run does not duplicate the activity, but follows the end date
+        due.contract_end_date += timedelta(days=2)
+        self.env['construction.control']._cron_check_deadlines()
+        self.assertEqual(self._activities(due), activity)
+        self.assertEqual(activity.date_deadline, due.contract_end_date)
+
+    def test_resume_from_cursor(self):
+        first, second, third = (self._create_due_contract() for _index in range(3))
+        # a previous run was stopped after committing the chunk of the first contract
+        self.ICP.set_param(DEADLINE_CURSOR_PARAM, first.id)
+
+        with patch.object(construction_pro, 'DEADLINE_CHUNK_SIZE', 1):
+            self.env['construction.control']._cron_check_deadlines()
+        self.assertFalse(self._activities(first))
+        self.assertEqual(len(self._activities(second | third)), 2)
+        self.assertIn(second.id, self.cursors)
+        self.assertIn(third.id, self.cursors)
+        self.assertEqual(self.cursors, sorted(self.cursors), "Chunks are committed in id order")
+        self.assertEqual(self.ICP.get_param(DEADLINE_CURSOR_PARAM), '0')
+
+    def test_domain_matches_open_index(self):
+        self.env.cr.execute("""
+            SELECT indexdef FROM pg_indexes
+             WHERE indexname = 'construction_control_open_states_end_date_index'
+        """)
+        [(indexdef,)] = self.env.cr.fetchall()
+        self.assertIn("WHERE ((state)::text = ANY", indexdef)
+
+        # the predicate is stated as is, without the IS NULL branch of a != leaf
+        Contract = self.env['construction.control']
+        query = Contract._search(Contract._get_deadline_domain())
+        where_clause = query.where_clause.code
+        self.assertIn('"construction_control"."state" IN', where_clause)
+        self.assertNotIn('"state" IS NULL', where_clause)
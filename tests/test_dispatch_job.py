@@ -0,0 +1,76 @@
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestDispatchJob(BmisCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.patch(self.env.cr, 'commit', lambda: None)
+
+    def _process(self, job):
+        with mute_logger('odoo.addons.egp_bmis.models.construction_control_dispatch_job'):
+            self.env['construction.control.dispatch.job']._cron_process_jobs()
+        job.invalidate_recordset()
+
+    def test_enqueue(self):
+        contracts = self._create_dispatchable_contract() | self._create_dispatchable_contract()
+        action = contracts.action_enqueue_dispatch('qc')
+        job = self.env['construction.control.dispatch.job'].browse(action['res_id'])
+        self.assertEqual((job.kind, job.state), ('qc', 'queued'))
+        self.assertEqual(job.contract_ids, contracts)
+        self.assertEqual(contracts.dispatch_job_id, job)
+
+        self._process(job)
+        contracts.invalidate_recordset(['dispatch_job_id'])
+        self.assertFalse(contracts.dispatch_job_id, "A finished job is no longer pending on the contracts")
+
+    def test_process_isolates_refused_contracts(self):
+        contracts = self._create_dispatchable_contract() | self._create_dispatchable_contract()
+        # no procurement contract, so no vendor: the dispatch refuses it
+        refused = self._create_contract()
+        job = self.env['construction.control.dispatch.job']._enqueue(contracts | refused, 'qc')
+
+        self._process(job)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.done_contract_ids, contracts)
+        self.assertEqual(job.failed_contract_ids, refused)
+        self.assertEqual(job.progress, 100.0)
+        self.assertIn(refused.contract_number, job.error)
+        self.assertEqual(contracts.construction_quality_ids.const_contract_id, contracts)
+        self.assertFalse(refused.construction_quality_ids)
+
+    def test_all_refused(self):
+        job = self.env['construction.control.dispatch.job']._enqueue(self._create_contract(), 'property')
+        self._process(job)
+        self.assertEqual(job.state, 'failed')
+        self.assertFalse(job.done_contract_ids)
+
+    def test_retry(self):
+        contract = self._create_dispatchable_contract()
+        job = self.env['construction.control.dispatch.job']._enqueue(contract, 'property')
+        job.max_attempts = 2
+
+        Contract = type(self.env['construction.control'])
+        Cron = type(self.env['ir.cron'])
+        with patch.object(Contract, 'action_send_to_property', side_effect=RuntimeError("connection lost")), \
+                patch.object(Cron, '_trigger') as trigger:
+            self._process(job)
+            self.assertEqual((job.state, job.attempts), ('queued', 1), "An unexpected error is retried")
+            self.assertEqual(trigger.call_count, 1, "The retry is scheduled")
+            self._process(job)
+            self.assertEqual((job.state, job.attempts), ('failed', 2))
+        self.assertIn("connection lost", job.error)
+        self.assertFalse(job.done_contract_ids | job.failed_contract_ids)
+
+        job.action_retry()
+        self.assertEqual((job.state, job.attempts, job.error), ('queued', 0, False))
+        self._process(job)
+        self.assertEqual(job.state, 'done')
+        self.assertEqual(job.done_contract_ids, contract)
+        self.assertEqual(contract.property_control_ids.const_contract_id, contract)
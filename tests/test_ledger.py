@@ -0,0 +1,101 @@
+from odoo.tests import tagged
+
+from odoo.addons.egp_bmis.models.construction_control_ledger import LEDGER_PENDING_KEY
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestLedger(BmisCommon):
+
+    def _ledger(self, contract, source='qc'):
+        # the queued ledger rows are refreshed by the precommit hook, run when the cursor is flushed
+        self.env.cr.flush()
+        return {
+            ledger.product_id: ledger
+            for ledger in self.env['construction.control.ledger'].search(
+                [('contract_id', '=', contract.id), ('source', '=', source)])
+        }
+
+    def _ledger_values(self, contracts):
+        self.env.cr.flush()
+        return sorted(self.env['construction.control.ledger'].search_read(
+            [('contract_id', 'in', contracts.ids)],
+            ['contract_id', 'product_id', 'source', 'approved_qty', 'rejected_qty',
+             'price_total', 'approved_value', 'line_count'], load=None), key=lambda r: r['id'])
+
+    def test_approved_qc_lines(self):
+        contract = self._create_dispatchable_contract()
+        contract.action_send_to_quality_control()
+        self.assertFalse(self._ledger(contract), "Lines not passed yet are not in the ledger")
+
+        self._approve_qc(contract, ratio=0.5)
+        ledger = self._ledger(contract)
+        self.assertEqual(set(ledger), set(contract.line_ids.product_id))
+        for line in contract.line_ids:
+            row = ledger[line.product_id]
+            self.assertAlmostEqual(row.approved_qty, 5.0)
+            self.assertAlmostEqual(row.rejected_qty, 5.0)
+            self.assertAlmostEqual(row.price_total, line.price)
+            self.assertAlmostEqual(row.approved_value, 5.0 * line.price)
+            self.assertEqual(row.line_count, 1)
+
+    def test_changes_and_deletions(self):
+        contract = self._create_dispatchable_contract()
+        contract.action_send_to_quality_control()
+        qc = self._approve_qc(contract, ratio=0.5)
+        first, second = qc.line_ids[:2]
+
+        first.approved_qty = 10.0
+        self.assertAlmostEqual(self._ledger(contract)[first.product_id].approved_qty, 10.0)
+
+        second.passed = False
+        self.assertNotIn(second.product_id, self._ledger(contract))
+
+        first.unlink()
+        self.assertFalse(self._ledger(contract))
+
+    def test_control_deletion(self):
+        contract = self._create_dispatchable_contract()
+        contract.action_send_to_quality_control()
+        qc = contract.construction_quality_ids
+        qc.line_ids.write({'passed': True, 'approved_qty': 5.0})
+        self.assertEqual(set(self._ledger(contract)), set(contract.line_ids.product_id))
+
+        # the lines are deleted by the database cascade
+        qc.unlink()
+        self.assertFalse(self._ledger(contract))
+
+    def test_only_touched_rows(self):
+        contract = self._create_dispatchable_contract()
+        contract.action_send_to_quality_control()
+        qc = self._approve_qc(contract, ratio=0.5)
+        ledger = self._ledger(contract)
+        first, second = qc.line_ids[:2]
+        untouched = ledger[second.product_id]
+
+        first.approved_qty = 8.0
+        self.assertEqual(self.env.cr.precommit.data[LEDGER_PENDING_KEY]['qc'],
+                         {(contract.id, first.product_id.id)})
+        ledger = self._ledger(contract)
+        self.assertAlmostEqual(ledger[first.product_id].approved_qty, 8.0)
+        self.assertEqual(ledger[second.product_id], untouched)
+
+    def test_ledger_matches_rebuild(self):
+        contracts = self._create_dispatchable_contract() | self._create_dispatchable_contract(lines=3)
+        contracts.action_send_to_quality_control()
+        self._approve_qc(contracts, ratio=0.4)
+        contracts.action_send_to_quality_control()
+        self._approve_qc(contracts[0], ratio=1.0)
+        incremental = self._ledger_values(contracts)
+        self.assertTrue(incremental)
+
+        self.env['construction.control.ledger']._rebuild(contracts.ids)
+        self.assertEqual(self._ledger_values(contracts), incremental)
+
+    def test_summary_html(self):
+        contract = self._create_dispatchable_contract(lines=1)
+        contract.action_send_to_quality_control()
+        self._approve_qc(contract)
+        html = contract.get_summary_html('qc')
+        self.assertIn(contract.line_ids.product_id.display_name, html)
@@ -0,0 +1,127 @@
+from unittest.mock import patch
+
+from odoo.addons.base.tests.common import new_test_user
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tools import mute_logger
+
+from odoo.addons.egp_bmis.models import construction_control_line_part
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestSubmitDeliveries(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Part = cls.env['construction.control.line.part']
+        cls.contract = cls._create_contract()
+        cls.line, cls.other_line = cls.contract.line_ids.sorted('id')
+
+    def _delivery(self, key=None, line=None, **vals):
+        return dict({
+            'line_id': (line or self.line).id,
+            'qty': 2.0,
+            'location': 'Block A',
+            'idempotency_key': key,
+        }, **vals)
+
+    def _parts(self, key):
+        return self.Part.search([('idempotency_key', '=', key)])
+
+    def test_submit(self):
+        results = self.Part._submit_batch([
+            self._delivery('k1', delivery_date='2026-01-15', notes='Morning'),
+            self._delivery('k2', line=self.other_line, unit_of_measure_id=self.uom_unit.id),
+            self._delivery('k3', qty=0),
+        ])
+        self.assertEqual([r['status'] for r in results], ['created', 'created', 'error'])
+        first = self.Part.browse(results[0]['id'])
+        self.assertEqual((first.line_id, first.qty, first.location), (self.line, 2.0, 'Block A'))
+        self.assertEqual(str(first.delivery_date), '2026-01-15')
+        self.assertEqual(first.unit_of_measure, self.line.unit_measure)
+        self.assertFalse(self._parts('k3'))
+        self.assertAlmostEqual(self.line.delivered_qty, 2.0)
+
+    def test_resubmit_is_idempotent(self):
+        first = self.Part._submit_batch([self._delivery('k1')])
+        again = self.Part._submit_batch([self._delivery('k1'), self._delivery('k2')])
+        self.assertEqual(again[0], {'status': 'duplicate', 'id': first[0]['id']})
+        self.assertEqual(again[1]['status'], 'created')
+        self.assertEqual(len(self._parts('k1')), 1)
+        self.assertAlmostEqual(self.line.delivered_qty, 4.0)
+
+    def test_key_resent_within_batch(self):
+        results = self.Part._submit_batch([self._delivery('k1'), self._delivery('k1', qty=3.0)])
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertEqual(results[1], {'status': 'duplicate', 'id': results[0]['id']})
+        self.assertEqual(self._parts('k1').qty, 2.0)
+
+    def test_key_of_hidden_contract(self):
+        other_warehouse = self.env['stock.warehouse'].create({'name': 'BMIS Hidden Warehouse', 'code': 'BMHW'})
+        hidden_line = self._create_contract(warehouse_id=other_warehouse.id).line_ids[0]
+        hidden = self.Part._submit_batch([self._delivery('k1', line=hidden_line)])
+        user = new_test_user(
+            self.env, 'bmis_part_user', groups='base.group_user,egp_bmis.group_bmis_warehouse_user',
+            bmis_warehouse_ids=[(6, 0, self.warehouse.ids)])
+
+        results = self.Part.with_user(user)._submit_batch([self._delivery('k1'), self._delivery('k2')])
+        self.assertEqual(results[0], {'status': 'duplicate', 'id': hidden[0]['id']},
+                         "A key is a duplicate even when its part cannot be read by the user")
+        self.assertEqual(results[1]['status'], 'created')
+        self.assertEqual(len(self._parts('k1')), 1)
+
+    def test_concurrent_key(self):
+        concurrent = self.Part._submit_batch([self._delivery('k1')])
+        get_parts_by_key = type(self.Part)._get_parts_by_key
+        calls = []
+
+        def _get_parts_by_key(part, keys):
+            # the first lookup runs before the concurrent request is committed
+            calls.append(keys)
+            return {} if len(calls) == 1 else get_parts_by_key(part, keys)
+
+        with patch.object(type(self.Part), '_get_parts_by_key', _get_parts_by_key), mute_logger('odoo.sql_db'):
+            results = self.Part._submit_batch([self._delivery('k2'), self._delivery('k1'), self._delivery('k3')])
+        self.assertEqual([r['status'] for r in results], ['created', 'duplicate', 'created'])
+        self.assertEqual(results[1]['id'], concurrent[0]['id'])
+        self.assertEqual(len(self._parts('k1')), 1)
+        self.assertTrue(self._parts('k2') and self._parts('k3'))
+
+    def test_invalid_types(self):
+        results = self.Part._submit_batch([
+            'not a delivery',
+            self._delivery('k1', line_id=str(self.line.id)),
+            self._delivery('k2', qty='a lot'),
+            self._delivery('k7', qty='nan'),
+            self._delivery('k8', qty=float('inf')),
+            self._delivery('k3', delivery_date='yesterday'),
+            self._delivery('k4', location=12),
+            self._delivery('k5', notes=['a', 'b']),
+            self._delivery(42),
+            self._delivery('k6', unit_of_measure_id=-1),
+        ])
+        self.assertEqual({r['status'] for r in results}, {'error'})
+        self.assertFalse(self.Part.search([('line_id', '=', self.line.id)]))
+        with self.assertRaises(UserError):
+            self.Part._submit_batch({'line_id': self.line.id})
+
+    def test_closed_contract(self):
+        self.contract.state = 'draft'
+        results = self.Part._submit_batch([self._delivery('k1')])
+        self.assertEqual(results[0]['status'], 'error')
+
+    def test_atomic(self):
+        results = self.Part._submit_batch(
+            [self._delivery('k1'), self._delivery('k1'), self._delivery('k2', location=' ')], atomic=True)
+        self.assertEqual([r['status'] for r in results], ['skipped', 'skipped', 'error'])
+        self.assertFalse(self._parts('k1'))
+
+        results = self.Part._submit_batch([self._delivery('k1'), self._delivery('k2')], atomic=True)
+        self.assertEqual([r['status'] for r in results], ['created', 'created'])
+
+    def test_batch_size(self):
+        with patch.object(construction_control_line_part, 'DELIVERY_BATCH_MAX', 2), self.assertRaises(UserError):
+            self.Part._submit_batch([self._delivery(f'k{index}') for index in range(3)])
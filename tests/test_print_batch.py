@@ -0,0 +1,94 @@
+import io
+import zipfile
+from unittest.mock import patch
+
+from odoo.tests import tagged
+from odoo.tools import config, mute_logger
+
+from odoo.addons.base.models.ir_actions_report import IrActionsReport
+from odoo.addons.egp_bmis.models import construction_control_print_batch
+from odoo.addons.egp_bmis.models.construction_control_print_batch import (
+    PRINT_DEFAULT_TIME_BUDGET, PRINT_WORKERS_PARAM,
+)
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestPrintBatch(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.contracts = cls._create_contract() | cls._create_contract()
+        cls.env['ir.config_parameter'].sudo().set_param(PRINT_WORKERS_PARAM, 1)
+
+    def setUp(self):
+        super().setUp()
+        # the workers open their own cursors, in test mode these share the test transaction
+        self.registry.enter_test_mode(self.cr)
+        self.addCleanup(self.registry.leave_test_mode)
+        self.patch(self.env.cr, 'commit', lambda: None)
+
+    def _process(self, failing=()):
+        def _render_qweb_pdf(report, report_ref, res_ids=None, data=None):
+            if set(res_ids) & set(failing):
+                raise ValueError("wkhtmltopdf failed")
+            return b'%PDF-' + str(res_ids[0]).encode(), 'pdf'
+
+        with patch.object(IrActionsReport, '_render_qweb_pdf', _render_qweb_pdf):
+            self.env['construction.control.print.batch']._cron_process_batches()
+        self.env.invalidate_all()
+
+    def test_action_print_batch(self):
+        action = self.contracts.action_print_batch()
+        batch = self.env['construction.control.print.batch'].browse(action['res_id'])
+        self.assertEqual(batch.state, 'queued')
+        self.assertEqual(batch.item_count, 2)
+        self.assertEqual(batch.item_ids.contract_id, self.contracts)
+        self.assertEqual(set(batch.item_ids.mapped('state')), {'pending'})
+        self.assertEqual(batch.user_id, self.env.user)
+
+    def test_process_batch(self):
+        batch = self.env['construction.control.print.batch']._create_for_contracts(self.contracts)
+        with mute_logger('odoo.addons.egp_bmis.models.construction_control_print_batch'):
+            self._process(failing=self.contracts[1].ids)
+
+        self.assertEqual(batch.state, 'done')
+        self.assertEqual(batch.progress, 100.0)
+        done, failed = batch.item_ids.sorted('id')
+        self.assertEqual((done.state, failed.state), ('done', 'failed'))
+        self.assertIn("wkhtmltopdf failed", failed.error)
+        self.assertFalse(done.attachment_id.exists(), "The single reports are dropped once zipped")
+
+        self.assertEqual(batch.attachment_id.mimetype, 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(batch.attachment_id.raw)) as archive:
+            self.assertEqual(archive.namelist(), [done._get_filename()])
+            self.assertEqual(archive.read(done._get_filename()), b'%PDF-' + str(done.contract_id.id).encode())
+        self.assertIn("could not be printed", batch.message_ids[0].body)
+
+    def test_process_batch_all_failed(self):
+        batch = self.env['construction.control.print.batch']._create_for_contracts(self.contracts)
+        with mute_logger('odoo.addons.egp_bmis.models.construction_control_print_batch'):
+            self._process(failing=self.contracts.ids)
+        self.assertEqual(batch.state, 'failed')
+        self.assertEqual(set(batch.item_ids.mapped('state')), {'failed'})
+
+    def test_time_budget(self):
+        Batch = self.env['construction.control.print.batch']
+        for limits, budget in (
+            ({'limit_time_real_cron': -1, 'limit_time_real': 120}, 60),
+            ({'limit_time_real_cron': 300, 'limit_time_real': 120}, 150),
+            ({'limit_time_real_cron': 0, 'limit_time_real': 120}, PRINT_DEFAULT_TIME_BUDGET),
+        ):
+            with patch.dict(config.options, limits):
+                self.assertEqual(Batch._get_time_budget(), budget)
+
+    def test_trigger_per_chunk(self):
+        self.env['construction.control.print.batch']._create_for_contracts(self.contracts)
+        triggers = []
+        with patch.object(construction_control_print_batch, 'PRINT_CHUNK_SIZE', 1), \
+                patch.object(type(self.env['ir.cron']), '_trigger', lambda cron, at=None: triggers.append(cron)):
+            self._process()
+        # one trigger per chunk, committed before the chunk is rendered
+        self.assertEqual(len(triggers), 2)
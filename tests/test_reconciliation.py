@@ -0,0 +1,85 @@
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestReconciliation(BmisCommon):
+
+    def _create_twin_contract(self):
+        """A contract with two lines of the same product, told apart by description and price."""
+        contract = self._create_dispatchable_contract(lines=1)
+        contract.write({'line_ids': [(0, 0, {
+            'product_id': self.products[0].id,
+            'unit_measure': self.uom_unit.id,
+            'description': 'Item 0 bis',
+            'first_estimation_qty': 4.0,
+            'second_estimation_qty': 4.0,
+            'price': 20.0,
+        })]})
+        return contract
+
+    def test_qc_quantities_per_line(self):
+        contract = self._create_dispatchable_contract()
+        contract.action_send_to_quality_control()
+        lines = contract.line_ids
+        self.assertEqual(lines.qc_line_ids.construction_line_id, lines)
+        for line in lines:
+            self.assertEqual(line.qc_line_ids.product_uom_qty, 10.0)
+
+        self._approve_qc(contract, ratio=0.4)
+        for line in lines:
+            self.assertAlmostEqual(line.qc_approved_qty, 4.0)
+            self.assertAlmostEqual(line.qc_remaining_qty, 6.0)
+            self.assertAlmostEqual(line.qc_approved_value, 4.0 * line.price)
+
+        # only the quantities not approved yet are dispatched again
+        contract.action_send_to_quality_control()
+        open_qc = contract.construction_quality_ids.filtered(lambda q: q.state != 'done')
+        self.assertEqual(open_qc.line_ids.mapped('product_uom_qty'), [6.0, 6.0])
+
+        self._approve_qc(contract)
+        self.assertEqual(lines.mapped('qc_remaining_qty'), [0.0, 0.0])
+        with self.assertRaises(UserError):
+            contract.action_send_to_quality_control()
+
+    def test_same_product_lines(self):
+        contract = self._create_twin_contract()
+        contract.action_send_to_quality_control()
+        qc_line = contract.construction_quality_ids.line_ids.filtered(lambda l: l.name == 'Item 0 bis')
+        qc_line.write({'passed': True, 'approved_qty': 4.0})
+
+        first, twin = contract.line_ids.sorted('id')
+        self.assertEqual(qc_line.construction_line_id, twin)
+        self.assertAlmostEqual(twin.qc_remaining_qty, 0.0)
+        self.assertAlmostEqual(first.qc_approved_qty, 0.0, msg="The approval goes to its own line only")
+        self.assertAlmostEqual(first.qc_remaining_qty, 10.0)
+
+    def test_property_received(self):
+        contract = self._create_dispatchable_contract(lines=1)
+        contract.action_send_to_property()
+        pc = contract.property_control_ids
+        self.assertEqual(pc.line_ids.construction_line_id, contract.line_ids)
+        pc.line_ids.approved_qty = 7.0
+        self.assertAlmostEqual(contract.line_ids.pc_received_qty, 0.0, msg="Only done controls are received")
+        pc.state = 'done'
+        self.assertAlmostEqual(contract.line_ids.pc_received_qty, 7.0)
+
+    def test_link_control_lines(self):
+        contract = self._create_twin_contract()
+        contract.action_send_to_quality_control()
+        contract.action_send_to_property()
+        control_lines = contract.construction_quality_ids.line_ids | contract.property_control_ids.line_ids
+        expected = {line: line.construction_line_id for line in control_lines}
+
+        # lines created before construction_line_id existed
+        self.env.flush_all()
+        for line in control_lines:
+            self.env.cr.execute(
+                f"UPDATE {line._table} SET construction_line_id = NULL WHERE id = %s", [line.id])
+        self.env.invalidate_all()
+        self.assertFalse(control_lines.construction_line_id)
+
+        self.env['construction.control.line']._link_control_lines()
+        self.assertEqual({line: line.construction_line_id for line in control_lines}, expected)
@@ -0,0 +1,45 @@
+from odoo.tests import Form, tagged
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRemeasure(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.contract = cls._create_contract(lines=3)
+
+    def _wizard_form(self):
+        return Form(self.env['construction.control.remeasure'].with_context(active_id=self.contract.id))
+
+    def _remeasure_messages(self):
+        return self.contract.message_ids.filtered(lambda m: 'Re-measurement' in (m.body or ''))
+
+    def test_apply(self):
+        lines = self.contract.line_ids.sorted('id')
+        form = self._wizard_form()
+        self.assertEqual(len(form.line_ids), 3)
+        with form.line_ids.edit(0) as wizard_line:
+            wizard_line.second_estimation_qty = 6.0
+        with form.line_ids.edit(2) as wizard_line:
+            wizard_line.second_estimation_qty = 6.0
+            wizard_line.max_qty = 12.0
+        # the readonly contract and lines are saved back thanks to force_save
+        wizard = form.save()
+        self.assertEqual(wizard.contract_id, self.contract)
+        self.assertEqual(wizard.line_ids.line_id, lines)
+
+        wizard.action_apply()
+        self.assertEqual(lines.mapped('second_estimation_qty'), [6.0, 8.0, 6.0])
+        self.assertEqual(lines[2].max_qty, 12.0)
+        messages = self._remeasure_messages()
+        self.assertEqual(len(messages), 1, "The changes are posted as one summary")
+        self.assertIn("2 lines updated", messages.body)
+
+    def test_apply_without_changes(self):
+        wizard = self._wizard_form().save()
+        self.assertEqual(wizard.action_apply(), {'type': 'ir.actions.act_window_close'})
+        self.assertFalse(self._remeasure_messages())
+        self.assertEqual(set(self.contract.line_ids.mapped('second_estimation_qty')), {8.0})
@@ -0,0 +1,101 @@
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from odoo.addons.base.models.ir_actions_report import IrActionsReport
+from odoo.addons.egp_bmis.models import construction_control_report
+from odoo.addons.egp_bmis.models.construction_control_report import CONTRACT_REPORT_NAME
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestContractReport(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.report = cls.env[f'report.{CONTRACT_REPORT_NAME}']
+        cls.contract = cls._create_contract(lines=4)
+
+    def _lines(self, values):
+        return [line for group in values['contracts'][self.contract.id]['groups'] for line in group['lines']]
+
+    def test_ordered_line_ids(self):
+        ordered_ids = self.report._get_ordered_line_ids(self.contract.ids, 'category')[self.contract.id]
+        lines = self.env['construction.control.line'].browse(ordered_ids)
+        self.assertEqual(sorted(ordered_ids), sorted(self.contract.line_ids.ids))
+        categories = lines.mapped('product_id.categ_id')
+        self.assertEqual(categories, self.category_a | self.category_b)
+        self.assertEqual(lines[:2].product_id.categ_id, lines[0].product_id.categ_id)
+        self.assertEqual(lines[2:].product_id.categ_id, lines[2].product_id.categ_id)
+
+    def test_report_values(self):
+        values = self.report._get_report_values(self.contract.ids)
+        contract_values = values['contracts'][self.contract.id]
+        self.assertEqual(contract_values['line_count'], 4)
+        self.assertAlmostEqual(contract_values['total'], sum(self.contract.line_ids.mapped('sub_total')))
+        self.assertTrue(contract_values['is_first_chunk'])
+        self.assertTrue(contract_values['is_last_chunk'])
+        self.assertEqual(len(contract_values['groups']), 2)
+        for group in contract_values['groups']:
+            self.assertAlmostEqual(group['total'], sum(line['sub_total'] for line in group['lines']))
+        self.assertEqual([line['index'] for line in self._lines(values)], [1, 2, 3, 4])
+
+    def test_report_values_chunk(self):
+        ordered_ids = self.report._get_ordered_line_ids(self.contract.ids, 'category')[self.contract.id]
+        first = self.report._get_report_values(self.contract.ids, {'line_ids': ordered_ids[:3], 'line_offset': 0})
+        last = self.report._get_report_values(self.contract.ids, {'line_ids': ordered_ids[3:], 'line_offset': 3})
+
+        self.assertEqual([line['id'] for line in self._lines(first)], ordered_ids[:3])
+        self.assertEqual([line['id'] for line in self._lines(last)], ordered_ids[3:])
+        self.assertEqual([line['index'] for line in self._lines(last)], [4])
+        first_values, last_values = first['contracts'][self.contract.id], last['contracts'][self.contract.id]
+        self.assertTrue(first_values['is_first_chunk'])
+        self.assertFalse(first_values['is_last_chunk'])
+        self.assertFalse(last_values['is_first_chunk'])
+        self.assertTrue(last_values['is_last_chunk'])
+        # group and contract totals cover the whole contract, not only the chunk
+        self.assertAlmostEqual(last_values['total'], first_values['total'])
+        last_category = self.env['construction.control.line'].browse(ordered_ids[3]).product_id.categ_id
+        self.assertAlmostEqual(last_values['groups'][0]['total'], sum(
+            self.contract.line_ids.filtered(lambda l: l.product_id.categ_id == last_category).mapped('sub_total')))
+
+    def test_render_in_chunks(self):
+        rendered = []
+
+        def _render_qweb_pdf(report, report_ref, res_ids=None, data=None):
+            rendered.append((res_ids, data))
+            return b'%d' % len(rendered), 'pdf'
+
+        Report = type(self.report)
+        ordered_line_ids = Report._get_ordered_line_ids
+        ordering_calls = []
+
+        def _get_ordered_line_ids(report, contract_ids, group_by):
+            ordering_calls.append(contract_ids)
+            return ordered_line_ids(report, contract_ids, group_by)
+
+        with patch.object(construction_control_report, 'REPORT_LINE_CHUNK_SIZE', 3), \
+                patch.object(construction_control_report, 'merge_pdf', lambda pdfs: b'|'.join(pdfs)), \
+                patch.object(IrActionsReport, '_render_qweb_pdf', _render_qweb_pdf), \
+                patch.object(Report, '_get_ordered_line_ids', _get_ordered_line_ids):
+            pdf, report_type = self.env['ir.actions.report']._render_qweb_pdf(
+                CONTRACT_REPORT_NAME, self.contract.ids)
+
+        self.assertEqual((pdf, report_type), (b'1|2', 'pdf'))
+        self.assertEqual(len(ordering_calls), 1, "The line order is read once for all the chunks")
+        self.assertEqual([data['line_offset'] for _ids, data in rendered], [0, 3])
+        self.assertEqual([len(data['line_ids']) for _ids, data in rendered], [3, 1])
+        self.assertEqual(
+            sorted(line_id for _ids, data in rendered for line_id in data['line_ids']),
+            sorted(self.contract.line_ids.ids))
+
+    def test_export_rows(self):
+        other = self._create_contract(lines=2)
+        with patch.object(construction_control_report, 'EXPORT_BATCH_SIZE', 1):
+            rows = list(self.report._iter_export_rows((self.contract | other).ids))
+        self.assertEqual(len(rows), 6)
+        lines = (self.contract | other).line_ids.sorted('id')
+        self.assertEqual([row[2] for row in rows], lines.mapped('description'))
+        self.assertEqual([row[9] for row in rows], lines.mapped('sub_total'))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import BmisCommon
+
+
+@tagged('post_install', '-at_install')
+class TestRevision(BmisCommon):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Revision = cls.env['construction.control.line.revision']
+        cls.contract = cls._create_contract()
+        cls.line, cls.other_line = cls.contract.line_ids.sorted('id')
+
+    def _revisions(self):
+        return self.Revision.search([('contract_id', '=', self.contract.id)])
+
+    def test_log_on_write(self):
+        self.contract.line_ids.write({'description': 'Renamed'})
+        self.assertFalse(self._revisions(), "Only estimation and price changes are logged")
+
+        # the other line already has this price, so only the first one changes
+        self.contract.line_ids.write({'price': 6.0})
+        revision = self._revisions()
+        self.assertEqual(revision.line_id, self.line)
+        self.assertEqual((revision.contract_id, revision.product_id), (self.contract, self.line.product_id))
+        self.assertEqual((revision.old_price, revision.new_price), (5.0, 6.0))
+        self.assertEqual((revision.old_first_estimation_qty, revision.new_first_estimation_qty), (10.0, 10.0))
+
+        self.line.first_estimation_qty = 12.0
+        self.assertEqual(len(self._revisions()), 2)
+
+    def test_deleted_line(self):
+        self.line.write({'first_estimation_qty': 12.0})
+        self.line.write({'first_estimation_qty': 14.0})
+        product = self.line.product_id
+        self.line.unlink()
+
+        revisions = self._revisions()
+        self.assertEqual(len(revisions), 2, "The revisions outlive their line")
+        self.assertFalse(revisions.line_id)
+        self.assertEqual((revisions.contract_id, revisions.product_id), (self.contract, product))
+
+        report = self.env['construction.control.revision.report'].create({
+            'date_from': fields.Datetime.now() - timedelta(days=1),
+            'contract_ids': [(6, 0, self.contract.ids)],
+        })
+        report.action_compute()
+        self.assertEqual(len(report.line_ids), 1)
+        self.assertEqual((report.line_ids.product_id, report.line_ids.revision_count), (product, 2))
+        self.assertEqual(report.line_ids.old_first_estimation_qty, 10.0)
+        self.assertEqual(report.line_ids.new_first_estimation_qty, 14.0)
@@ -0,0 +1,3 @@
+from . import construction_control_remeasure
+from . import construction_control_boq_import
+from . import construction_control_revision_report
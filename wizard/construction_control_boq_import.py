@@ -0,0 +1,202 @@
+import base64
+import csv
+import io
+import math
+import zipfile
+from contextlib import contextmanager
+
+from odoo import models, fields, _
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+try:
+    import openpyxl
+    from openpyxl.utils.exceptions import InvalidFileException
+except ImportError:
+    openpyxl = InvalidFileException = None
+
+# Lines created per batch.
+BOQ_IMPORT_BATCH_SIZE = 1000
+# Errors listed in the validation message.
+BOQ_IMPORT_MAX_ERRORS = 50
+
+# line field -> accepted column headers, lower case
+BOQ_COLUMNS = {
+    'product': ('product', 'product code', 'internal reference'),
+    'description': ('description',),
+    'unit': ('unit', 'uom', 'unit of measure'),
+    'first_estimation_qty': ('first estimation', 'initial estimation', 'quantity', 'qty'),
+    'price': ('price', 'unit price'),
+    'second_estimation_qty': ('second estimation',),
+    'max_qty': ('max qty', 'maximum allowed quantity'),
+}
+BOQ_REQUIRED_COLUMNS = ('product', 'first_estimation_qty', 'price')
+
+
+def _cell_text(value):
+    """Text of a cell; integral numbers, as XLSX stores numeric product codes, lose their '.0'."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+class ConstructionControlBoqImport(models.TransientModel):
+    """
+    Import of a bill of quantities into the lines of a contract. The file is
+    streamed from the filestore in batches of rows: each distinct product and
+    unit is looked up once, every row is validated and the valid lines are
+    created without tracking. Nothing is kept when a row is invalid.
+    """
+    _name = 'construction.control.boq.import'
+    _description = 'Bill of Quantities Import'
+
+    contract_id = fields.Many2one('construction.control', string='Construction Control', required=True, readonly=True)
+    file = fields.Binary(string='File', required=True, help='CSV or XLSX file with a header row.')
+    filename = fields.Char(string='File Name')
+
+    @contextmanager
+    def _open_file(self):
+        """Binary stream of the uploaded file, read from the filestore rather than decoded in memory."""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if attachment.store_fname:
+            with open(attachment._full_path(attachment.store_fname), 'rb') as file:
+                yield file
+        else:
+            yield io.BytesIO(attachment.raw if attachment else base64.b64decode(self.file or b''))
+
+    def _iter_rows(self):
+        """Yield the rows of the file as sequences of cell values, header included."""
+        with self._open_file() as file:
+            if (self.filename or '').lower().endswith('.xlsx'):
+                if openpyxl is None:
+                    raise UserError(_("The openpyxl library is required to import XLSX files, please use CSV."))
+                try:
+                    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+                except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError):
+                    raise UserError(_("The file %s is not a valid XLSX file.", self.filename))
+                try:
+                    yield from workbook.active.iter_rows(values_only=True)
+                finally:
+                    workbook.close()
+            else:
+                try:
+                    yield from csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig'))
+                except UnicodeDecodeError:
+                    raise UserError(_("The file %s is not a UTF-8 encoded CSV file.", self.filename or ''))
+                except csv.Error as e:
+                    raise UserError(_("The file %(file)s is not a valid CSV file: %(error)s",
+                                      file=self.filename or '', error=e))
+
+    def _iter_data_rows(self):
+        """Map the columns from the header and yield the data rows as dicts, with their row number."""
+        rows = self._iter_rows()
+        header = [str(cell or '').strip().lower() for cell in next(rows, [])]
+        columns = {}
+        for fname, labels in BOQ_COLUMNS.items():
+            for index, cell in enumerate(header):
+                if cell in labels:
+                    columns[fname] = index
+                    break
+        missing = [fname for fname in BOQ_REQUIRED_COLUMNS if fname not in columns]
+        if missing:
+            raise UserError(_("Missing columns in the file: %s", ", ".join(BOQ_COLUMNS[f][0] for f in missing)))
+        for number, row in enumerate(rows, start=2):
+            if not any(cell not in (None, '') for cell in row):
+                continue
+            yield number, {fname: row[index] if index < len(row) else None for fname, index in columns.items()}
+
+    def _resolve(self, rows, products, units):
+        """
+        Add to ``products`` (by internal reference then name) and ``units``
+        (by name) the values of ``rows`` not looked up yet; unknown values map
+        to an empty recordset, so that every distinct value is queried once.
+        """
+        Product = self.env['product.product']
+        keys = {_cell_text(row['product']) for _number, row in rows} - {''}
+        keys -= set(products)
+        if keys:
+            found = {}
+            for product in Product.search([('default_code', 'in', list(keys))]):
+                found.setdefault(product.default_code, product)
+            for product in Product.search([('name', 'in', list(keys - set(found)))]):
+                found.setdefault(product.name, product)
+            products.update({key: found.get(key, Product) for key in keys})
+        UoM = self.env['uom.uom']
+        unit_names = {_cell_text(row.get('unit')) for _number, row in rows} - {''}
+        unit_names -= set(units)
+        if unit_names:
+            found = {uom.name: uom for uom in UoM.search([('name', 'in', list(unit_names))])}
+            units.update({name: found.get(name, UoM) for name in unit_names})
+
+    def _validate_row(self, number, row, products, units):
+        """Return the values of the line of ``row``, and None or the error message of the row."""
+        product = products.get(_cell_text(row['product']))
+        unit_name = _cell_text(row.get('unit'))
+        unit = units.get(unit_name) if unit_name else product and product.uom_id
+        try:
+            quantities = {
+                fname: float(row[fname] or 0.0)
+                for fname in ('first_estimation_qty', 'price', 'second_estimation_qty', 'max_qty') if fname in row
+            }
+        except (TypeError, ValueError):
+            return None, _("Row %s: invalid number.", number)
+        # float() accepts 'nan' and 'inf', which no comparison below would catch
+        if not all(math.isfinite(value) for value in quantities.values()):
+            return None, _("Row %s: invalid number.", number)
+        if not product:
+            return None, _("Row %(row)s: unknown product %(product)s.", row=number, product=row['product'])
+        if not unit:
+            return None, _("Row %(row)s: unknown unit %(unit)s.", row=number, unit=unit_name)
+        if unit.category_id != product.uom_id.category_id:
+            return None, _("Row %(row)s: unit %(unit)s does not match the product %(product)s.",
+                           row=number, unit=unit.name, product=product.display_name)
+        if any(value < 0 for value in quantities.values()):
+            return None, _("Row %s: quantities and prices cannot be negative.", number)
+        return dict(
+            quantities,
+            construction_control_id=self.contract_id.id,
+            product_id=product.id,
+            unit_measure=unit.id,
+            description=_cell_text(row.get('description')) or False,
+        ), None
+
+    def action_import(self):
+        self.ensure_one()
+        Line = self.env['construction.control.line'].with_context(tracking_disable=True)
+        products, units = {}, {}
+        count, errors, error_count = 0, [], 0
+        for rows in split_every(BOQ_IMPORT_BATCH_SIZE, self._iter_data_rows(), list):
+            self._resolve(rows, products, units)
+            vals_list = []
+            for number, row in rows:
+                vals, error = self._validate_row(number, row, products, units)
+                if error:
+                    error_count += 1
+                    if len(errors) < BOQ_IMPORT_MAX_ERRORS:
+                        errors.append(error)
+                else:
+                    vals_list.append(vals)
+            count += len(vals_list)
+            # once a row is invalid the import is rolled back: only validate the rest of the file
+            if vals_list and not error_count:
+                # stored computes run once for the whole batch when it is flushed
+                Line.create(vals_list)
+                Line.flush_model()
+                Line.invalidate_model()
+        if errors:
+            message = "\n".join(errors)
+            if error_count > len(errors):
+                message += "\n" + _("... and %s more errors.", error_count - len(errors))
+            raise UserError(message)
+        if not count:
+            raise UserError(_("The file does not contain any line."))
+
+        self.contract_id.message_post(body=_("📥 Bill of quantities imported: %(count)s lines from %(file)s",
+                                             count=count, file=self.filename or ''))
+        return {'type': 'ir.actions.act_window_close'}
@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from odoo import models, fields, api, _
+from odoo.tools import split_every
+
+# Re-measured lines written per query.
+REMEASURE_BATCH_SIZE = 500
+
+REMEASURE_FIELDS = ['second_estimation_qty', 'max_qty']
+
+
+class ConstructionControlRemeasure(models.TransientModel):
+    """
+    Bulk re-measurement of the lines of a contract. Lines are written in
+    batches without per-line tracking and the changes are posted as a single
+    summary on the contract.
+    """
+    _name = 'construction.control.remeasure'
+    _description = 'Construction Contract Re-measurement'
+
+    contract_id = fields.Many2one('construction.control', string='Construction Control', required=True, readonly=True)
+    line_ids = fields.One2many('construction.control.remeasure.line', 'wizard_id', string='Lines')
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        contract_id = res.get('contract_id') or self.env.context.get('active_id')
+        if contract_id and 'line_ids' in fields_list:
+            res['contract_id'] = contract_id
+            res['line_ids'] = [(0, 0, {
+                'line_id': line['id'],
+                'second_estimation_qty': line['second_estimation_qty'],
+                'max_qty': line['max_qty'],
+            }) for line in self.env['construction.control.line'].search_read(
+                [('construction_control_id', '=', contract_id)], REMEASURE_FIELDS, order='id')]
+        return res
+
+    def action_apply(self):
+        self.ensure_one()
+        Line = self.env['construction.control.line']
+        current = {line['id']: line for line in Line.search_read(
+            [('id', 'in', self.line_ids.line_id.ids)], ['product_id', 'description'] + REMEASURE_FIELDS)}
+
+        # group the lines by new values so that each distinct change is one write per batch
+        updates = defaultdict(list)
+        changes = []
+        for wizard_line in self.line_ids:
+            line = current[wizard_line.line_id.id]
+            vals = {fname: wizard_line[fname] for fname in REMEASURE_FIELDS if wizard_line[fname] != line[fname]}
+            if not vals:
+                continue
+            updates[tuple(sorted(vals.items()))].append(line['id'])
+            changes.append({
+                'product': line['product_id'][1] if line['product_id'] else '',
+                'description': line['description'] or '',
+                'old_second_estimation_qty': line['second_estimation_qty'],
+                'new_second_estimation_qty': wizard_line.second_estimation_qty,
+                'old_max_qty': line['max_qty'],
+                'new_max_qty': wizard_line.max_qty,
+            })
+        if not changes:
+            return {'type': 'ir.actions.act_window_close'}
+
+        for vals, line_ids in updates.items():
+            for batch in split_every(REMEASURE_BATCH_SIZE, line_ids):
+                Line.browse(batch).with_context(tracking_disable=True).write(dict(vals))
+
+        self.contract_id.message_post(body=self.env['ir.qweb']._render('egp_bmis.remeasure_summary', {
+            'title': _("📐 Re-measurement: %s lines updated", len(changes)),
+            'changes': changes,
+        }))
+        return {'type': 'ir.actions.act_window_close'}
+
+
+class ConstructionControlRemeasureLine(models.TransientModel):
+    _name = 'construction.control.remeasure.line'
+    _description = 'Construction Contract Re-measurement Line'
+
+    wizard_id = fields.Many2one('construction.control.remeasure', required=True, ondelete='cascade')
+    line_id = fields.Many2one('construction.control.line', string='Construction Item', required=True, readonly=True)
+    product_id = fields.Many2one(related='line_id.product_id')
+    description = fields.Text(related='line_id.description')
+    unit_measure = fields.Many2one(related='line_id.unit_measure')
+    first_estimation_qty = fields.Float(related='line_id.first_estimation_qty')
+    second_estimation_qty = fields.Float(string='Second Estimation')
+    max_qty = fields.Float(string='Maximum Allowed Quantity')
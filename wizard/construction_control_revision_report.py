@@ -0,0 +1,65 @@
+from dateutil.relativedelta import relativedelta
+
+from odoo import models, fields, _
+
+from ..models.construction_control_line_revision import REVISION_FIELDS
+
+
+class ConstructionControlRevisionReport(models.TransientModel):
+    """
+    Net estimation and price changes of the construction lines since a date,
+    read from the revision log with one grouped query.
+    """
+    _name = 'construction.control.revision.report'
+    _description = 'Estimation Changes Since a Date'
+
+    date_from = fields.Datetime(
+        string='Changed Since',
+        required=True,
+        default=lambda self: fields.Datetime.now() - relativedelta(months=1)
+    )
+    contract_ids = fields.Many2many(
+        'construction.control',
+        string='Contracts',
+        help='Leave empty to report the changes of all contracts.'
+    )
+    line_ids = fields.One2many('construction.control.revision.report.line', 'report_id', string='Changes', readonly=True)
+
+    def action_compute(self):
+        self.ensure_one()
+        changes = self.env['construction.control.line.revision']._get_changes_since(
+            self.date_from, self.contract_ids.ids or None)
+        self.line_ids = [(5, 0, 0)] + [(0, 0, {
+            'line_id': change['line_id'],
+            'contract_id': change['contract_id'],
+            'product_id': change['product_id'],
+            'revision_count': change['revision_count'],
+            **{f'{prefix}_{fname}': change[f'{prefix}_{fname}']
+               for fname in REVISION_FIELDS for prefix in ('old', 'new')},
+        }) for change in changes]
+        return {
+            'type': 'ir.actions.act_window',
+            'name': _('Estimation Changes'),
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class ConstructionControlRevisionReportLine(models.TransientModel):
+    _name = 'construction.control.revision.report.line'
+    _description = 'Estimation Change of a Construction Item'
+    _order = 'contract_id, line_id'
+
+    report_id = fields.Many2one('construction.control.revision.report', required=True, ondelete='cascade')
+    line_id = fields.Many2one('construction.control.line', string='Construction Item')
+    contract_id = fields.Many2one('construction.control', string='Construction Control')
+    product_id = fields.Many2one('product.product', string='Product')
+    revision_count = fields.Integer(string='Revisions')
+    old_first_estimation_qty = fields.Float(string='Old Initial Estimation')
+    new_first_estimation_qty = fields.Float(string='New Initial Estimation')
+    old_second_estimation_qty = fields.Float(string='Old Second Estimation')
+    new_second_estimation_qty = fields.Float(string='New Second Estimation')
+    old_price = fields.Float(string='Old Unit Price')
+    new_price = fields.Float(string='New Unit Price')